@@ -1,292 +1,151 @@
-from math import inf, sqrt
+from threading import Thread
 from tkinter import*
+from tkinter import filedialog
 
-class Astar:
-    
-    def __init__(self, heuristic_type, start, goal):
-        self.heuristic_type = heuristic_type
-        self.start = start
-        self.goal = goal
-        self.open_list = []
-        self.closed_list = []
-        self.solution = []
-        self.configurations = {
-            self.start: [0,0,self.distance_heuristic(self.start), None]
-        }
-            
-
-    def distance_heuristic(self, node):
-        """ 
-        calculates the distance heuristic (h-value) for a given node
-        
-        parameters:
-        - node: a 9-tuple containing the board information for a configuration
-        """
-        
-        position = {
-            self.goal[0]: (0,0),
-            self.goal[1]: (0,1),
-            self.goal[2]: (0,2),
-            self.goal[3]: (1,0),
-            self.goal[4]: (1,1),
-            self.goal[5]: (1,2),
-            self.goal[6]: (2,0),
-            self.goal[7]: (2,1),
-            self.goal[8]: (2,2)
-        }
-        
-        if self.heuristic_type == "absolute":
-            # calculate the straight line distance that a tile needs
-            # to travel to be in the correct place
+from batch import parse_config
+from distance_oracle import STANDARD_GOALS
+from solver import Astar, check_valid
 
-            # find the distance between each node and its intended position
-            # and add it to the total
-            total = 0
-            for i in range(9):
-                goal_position = position[node[i]]
-                actual_position = position[i]
-                total += sqrt((goal_position[0]-actual_position[0])**2+(goal_position[1]-actual_position[1])**2)
+# how often the GUI checks on a search running in the background, in milliseconds
+POLL_INTERVAL = 100
+# the starting time between steps when the solution is played, in milliseconds
+AUTOPLAY_DELAY = 500
 
-            return total
 
-        elif self.heuristic_type == "manhattan":
-            """
-            find the manhattan distance between the nodes, that is, the straight line
-            distance without diagonals
-            """
-
-            # find the manhattan distance between each node and its intended position
-            # then add it to the total
-            total = 0
-            for i in range(9):
-                goal_position = position[node[i]]
-                actual_position = position[i]
-                total += abs(goal_position[0]-actual_position[0])+abs(goal_position[1]-actual_position[1])
-
-            return total
-
-
-    def find_min(self):
-        """
-        find the node with the minimum f value in the open list
-        """
-        minimum = inf
-        min_node = None
-        for node in self.open_list:
-            if self.configurations[node][0] < minimum:
-                minimum = self.configurations[node][0]
-                min_node = node
-        return min_node
-
-
-    def child(self, swap, node, blank_index):
+class SolutionViewer:
+    """
+    shows the solution of a search one configuration at a time, with buttons to step through it, a slider to
+    jump to any step, autoplay, and a button to save the path to a file. the position in the solution is kept,
+    so each step only looks up the configuration at the new position
+    
+    parameters:
+    - root: the window to show the solution in
+    - astar: the search, once it has been run
+    """
+    
+    def __init__(self, root, astar):
+        self.root = root
+        self.astar = astar
+        self.solution = astar.solution
+        self.position = 0
+        self.playing = False
+        # the id of the next autoplay step, so it can be cancelled when autoplay is stopped
+        self.play_job = None
+        rows, columns = astar.board.rows, astar.board.columns
         
-        """
-        swap two positions in a configuration, and update their values in the configurations
-        dictionary, or add the new configuration to the dictionary
+        self.top_label = Label(root, text="Start")
+        self.top_label.grid(column=0, row=0, columnspan=columns)
         
-        parameters:
-        - swap: the new position for the blank tile
-        - node: the configuration to work on
-        - blank_index: the position of the blank tile
-        """
+        # a button for each tile, for boards of any size
+        self.tiles = []
+        for i in range(rows):
+            for j in range(columns):
+                b = Button(root, text="")
+                b.grid(row=i+1, column=j)
+                self.tiles.append(b)
         
-        # swap the two positions
-        new_config = list(node)
-        temp = new_config[blank_index]
-        new_config[blank_index] = new_config[swap]
-        new_config[swap] = temp
-        new_config = tuple(new_config)
+        Button(root, text="Next", command=self.next_stage).grid(row=1, column=columns+1)
+        Button(root, text="Prev", command=self.prev_stage).grid(row=2, column=columns+1)
+        self.play_button = Button(root, text="Play", command=self.toggle_play)
+        self.play_button.grid(row=3, column=columns+1)
+        Button(root, text="Save", command=self.save).grid(row=4, column=columns+1)
         
-        # find the distance heuristic
-        h = self.distance_heuristic(new_config)
+        self.step_scale = Scale(root, from_=0, to=len(self.solution)-1, orient=HORIZONTAL, label="Step", command=self.jump)
+        self.step_scale.grid(row=rows+1, column=0, columnspan=columns+2, sticky="ew")
+        self.delay = IntVar(value=AUTOPLAY_DELAY)
+        Scale(root, from_=50, to=2000, orient=HORIZONTAL, label="Autoplay delay (ms)",
+              variable=self.delay).grid(row=rows+2, column=0, columnspan=columns+2, sticky="ew")
         
-        # if the new configuration (after the swap) is already exisiting,
-        # update it's h value, otherwise create a new entry.
-        if new_config in self.configurations.keys():
-            self.configurations[new_config] = [self.configurations[new_config][0]+h, 0, h, self.configurations[new_config][3]]
-        else:
-            self.configurations[new_config] = [h, 0, h, None]
-
-        return new_config
-
-    def expand(self, node):
-        """
-        expand a node, and return its children
+        self.show(0)
         
-        parameters:
-        - node: the configuration to expand
+    def show(self, position):
         """
-        
-        # a dictionary of the possible moves that can be made depending on where the blank space is
-        swaps = {
-            0: [1,3],
-            1: [0,2,4],
-            2: [1,5],
-            3: [0,4,6],
-            4: [1,3,5,7],
-            5: [2,4,8],
-            6: [3,7],
-            7: [4,6,8],
-            8: [5,7]
-        }
-
-        # for each possible move, make the move and add the result to the list
-        children = []
-
-        blank_index = node.index(0)
-        for swap in swaps[blank_index]:
-            new_child = self.child(swap, node, blank_index)
-            if new_child in self.configurations.keys():
-                children.append(new_child)
-
-        return children
-
-
-    def backtrack(self, current):
-        """ 
-        recursively find the solution path by looking through the parents of each child
+        display the configuration at a position in the solution path
         """
-        if current == None:
-            return
-        self.solution.append(current)
-        self.backtrack(self.configurations[current][3])
+        self.position = position
+        config = self.solution[position]
+        for i in range(len(config)):
+            self.tiles[i].config(text=config[i])
         
+        if position == 0:
+            self.top_label.config(text="Start")
+        elif position == len(self.solution)-1:
+            self.top_label.config(text="Finish")
+        else:
+            self.top_label.config(text="Step " + str(position) + " of " + str(len(self.solution)-1))
+        self.step_scale.set(position)
         
-    def next_stage(self, labels):
+    def next_stage(self):
         """
         display the next configuration in the solution path
-        
-        parameters:
-        - labels: the labels to display the numbers on
-        - sol: the solution path
         """
-        
-        sol = self.solution
-        
-        config = tuple([int(label["text"]) for label in labels[:9]])
-        pos = sol.index(config)
-
-        if config == self.goal:
-            labels[9].config(text="Finish")
-            return
-        elif sol[pos+1] == self.goal:
-            labels[9].config(text="Finish")
-        else:
-            labels[9].config(text="")
-            
-        for i in range(9):
-            labels[i].config(text = sol[pos+1][i])
+        if self.position < len(self.solution)-1:
+            self.show(self.position+1)
             
-    def prev_stage(self, labels):
+    def prev_stage(self):
         """
         display the previous configuration in the solution path
-        
-        parameters:
-        - labels: the labels to display the numbers on
-        - sol: the solution path
         """
-        
-        sol = self.solution
-        
-        config = tuple([int(label["text"]) for label in labels[:9]])
-        pos = sol.index(config)
-        
-        if config == self.start or sol[pos-1] == self.start:
-            labels[9].config(text="Start")
-            return
-        else:
-            labels[9].config(text="")
+        if self.position > 0:
+            self.show(self.position-1)
             
-        for i in range(9):
-            labels[i].config(text = sol[pos-1][i])
-        
-
-    def algorithm(self):
+    def jump(self, value):
         """
-        A* Algorithm
+        display the configuration at the step chosen on the slider
         """
-        
-        self.open_list.append(self.start)
-
-
-        # A* Algorithm
-        while len(self.open_list) > 0:
+        # moving the slider in show calls this too, but the position is already right
+        if int(value) != self.position:
+            self.show(int(value))
             
-            # find the node with the minimum f value in the open list
-            current = self.find_min()
+    def toggle_play(self):
+        """
+        start or stop stepping through the solution automatically, starting again from the start if it is at the end
+        """
+        self.playing = not self.playing
+        self.play_button.config(text="Pause" if self.playing else "Play")
+        # a step still waiting from before a pause would otherwise run alongside the new ones
+        if self.play_job is not None:
+            self.root.after_cancel(self.play_job)
+            self.play_job = None
+        if self.playing:
+            if self.position == len(self.solution)-1:
+                self.show(0)
+            self.play_job = self.root.after(self.delay.get(), self.play_step)
             
-            # add it to the closed list and remove it from the open list
-            self.open_list.remove(current)
-            self.closed_list.append(current)
-
-            # if we are done, the finish
-            if current == self.goal:
-                break
-
-            # for each child node
-            for config in self.expand(current):
-                
-                # continue if the node is already closed
-                if config in self.closed_list:
-                    continue
-                
-                # update the distance from the start node
-                cost = self.configurations[current][1] + 1
-                
-                # if the new cost is better than the old cost, prepare it to be updated
-                if config in self.open_list and cost < self.configurations[config][1]:
-                    self.open_list.remove(config)
-                elif config in self.closed_list and cost < self.configurations[config][1]:
-                    self.closed_list.remove(config)
-                
-                # if it is in neither the open or closed list, add it to the open list, and update
-                # the cost of getting to the node
-                if config not in self.open_list and config not in self.closed_list:
-                    self.open_list.append(config)
-                    self.configurations[config][1] = cost
-                    self.configurations[config][2] = self.distance_heuristic(config)
-                    self.configurations[config][0] = self.configurations[config][1]+self.configurations[config][2]
-                    self.configurations[config][3] = current
-
+    def play_step(self):
+        self.play_job = None
+        if not self.playing:
+            return
+        self.next_stage()
+        if self.position == len(self.solution)-1:
+            self.toggle_play()
+        else:
+            self.play_job = self.root.after(self.delay.get(), self.play_step)
+            
+    def save(self):
+        """
+        ask for a file name, and save the solution path to it
+        """
+        filename = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt")])
+        if filename:
+            self.astar.save_solution(filename)
 
-        # find the solution path
-        self.backtrack(self.goal)
-        self.solution.reverse()
-        
-def count_inversions(start_tuple):
+def standard_goal(start_tuple):
     """
-    Count the number of inversions required to solve the configuration
+    find the standard goal a start can reach, of the same size. the 8-puzzle has the two goals the GUI has
+    always offered, and other square boards have the tiles in order with the blank last, or the same with
+    the last two tiles swapped, which has the other parity
     """
-    
-    swap_count = 0
-    for i in range(9):
-        for j in range(i+1,9):
-            if start_tuple[i] < start_tuple[j]:
-                swap_count += 1
-                
-    return swap_count
-        
-def check_valid(start_tuple, goal_tuple):
-    """
-    Check whether a given state is valid, and solvable
-    """
-    
-    # if the tuple is not valid
-    if set(start_tuple) != set([0, 1, 2, 3, 4, 5, 6, 7, 8]) or set(goal_tuple) != set([0, 1, 2, 3, 4, 5, 6, 7, 8]):
-        return [False, "invalid"]
-    
-    elif len(start_tuple) != 9 or len(goal_tuple) != 9:
-        return [False, "invalid"]    
-    
-    # check whether the parity of the start and goal are acceptable
-    swap_count_start = count_inversions(start_tuple)
-    swap_count_goal = count_inversions(goal_tuple) 
-       
-    if swap_count_start%2 != swap_count_goal%2:
-        return [False, "parity"]
-    
-    return [True, None]
+    if len(start_tuple) == 9:
+        goals = STANDARD_GOALS
+    else:
+        ordered = list(range(1, len(start_tuple))) + [0]
+        swapped = ordered[:]
+        swapped[-3], swapped[-2] = swapped[-2], swapped[-3]
+        goals = [tuple(ordered), tuple(swapped)]
+    for goal in goals:
+        if check_valid(start_tuple, goal)[0]:
+            return goal
 
 def reset_gui(error_label, standard_solve_yes, standard_solve_no):
     """
@@ -297,42 +156,65 @@ def reset_gui(error_label, standard_solve_yes, standard_solve_no):
     standard_solve_no.destroy()
     standard_solve_yes.destroy()
     
+def solve_in_background(astar, widgets, start_button, error_label):
+    """
+    run the search on a worker thread so the window keeps responding, showing its progress and a button to
+    cancel it. the GUI checks on the search every POLL_INTERVAL milliseconds, and once it has finished,
+    clears the input widgets and shows the solution in a SolutionViewer
+    
+    parameters:
+    - astar: the search to run
+    - widgets: the widgets to remove once the search has finished
+    - start_button: the button that started the search, which is disabled while it runs
+    - error_label: the label to report a cancelled search on
+    """
+    
+    start_button.config(state=DISABLED)
+    error_label.config(text="")
+    progress_label = Label(root, text="Searching...")
+    progress_label.grid(row=7, column=0, columnspan=5)
+    cancel_button = Button(root, text="Cancel", command=astar.cancel)
+    cancel_button.grid(row=8, column=0)
+    
+    worker = Thread(target=astar.algorithm, daemon=True)
+    worker.start()
+    
+    def poll():
+        # while the search is running, show how far it has got and check again later
+        if worker.is_alive():
+            progress_label.config(text="Expanded " + str(astar.expanded) + " nodes, f bound " + str(astar.bound)
+                                  + ", " + str(astar.frontier_size) + " open")
+            root.after(POLL_INTERVAL, poll)
+            return
+        
+        progress_label.destroy()
+        cancel_button.destroy()
+        
+        # let the user change the configuration and start again if the search was cancelled
+        if astar.cancelled:
+            start_button.config(state=NORMAL)
+            error_label.config(text="The search was cancelled")
+            return
+        
+        for widget in widgets:
+            widget.destroy()
+        SolutionViewer(root, astar)
+    
+    root.after(POLL_INTERVAL, poll)
+    
 def start_standard_algorithm(start_button, manhattan_pick, absolute_pick, start_entry, start_tuple, goal_tuple, heuristic_type, goal_entry, error_label, standard_solve_no, standard_solve_yes):
     """
     Start the A* Algorithm with a standard configuration
     """
     
-    # start the algorithm
-    astar = Astar(heuristic_type.get(), start_tuple, goal_tuple)
-    astar.algorithm()
-    
-    # clear the GUI
-    start_button.destroy()
-    start_entry.destroy()
-    manhattan_pick.destroy()
-    absolute_pick.destroy()
-    error_label.destroy()
+    # the offer to solve to a standard configuration has been taken, so remove it
     standard_solve_no.destroy()
     standard_solve_yes.destroy()
-    goal_entry.destroy()
-    
-    labels = []
     
-    #display the solution in a GUI
-    top_label = Label(root, text="Start")
-    top_label.grid(column=0, row=0, columnspan=3)
-
-    for i in range(3):
-        for j in range(3):
-            b = Button(root, text=astar.start[3*i+j])
-            b.grid(row=i+1, column=j)
-            labels.append(b)
-    labels.append(top_label)
-            
-    next_button = Button(root, text="Next", command=lambda: astar.next_stage(labels))
-    next_button.grid(row=1, column=4)
-    prev_button = Button(root, text="Prev", command=lambda: astar.prev_stage(labels))  
-    prev_button.grid(row=2, column=4) 
+    # start the algorithm
+    astar = Astar(heuristic_type.get(), start_tuple, goal_tuple)
+    solve_in_background(astar, [start_button, start_entry, manhattan_pick, absolute_pick, error_label, goal_entry],
+                        start_button, error_label)
        
 def start_algorithm(start_button, manhattan_pick, absolute_pick, start_entry, heuristic_type, goal_entry, error_label):
     """
@@ -340,8 +222,13 @@ def start_algorithm(start_button, manhattan_pick, absolute_pick, start_entry, he
     user the option to solve it to a standard goal state.
     """
     
-    start_tuple = tuple([int(i) for i in start_entry.get()])
-    goal_tuple = tuple([int(i) for i in goal_entry.get()])
+    # configurations are typed as a string of digits, or as comma separated tiles for tiles of 10 or more
+    try:
+        start_tuple = parse_config(start_entry.get())
+        goal_tuple = parse_config(goal_entry.get())
+    except ValueError:
+        error_label.config(text = "This configuration is not valid. Please enter a valid configuration")
+        return
     
     # check whether the solution is valid and solvable
     validity = check_valid(start_tuple, goal_tuple)
@@ -353,70 +240,44 @@ def start_algorithm(start_button, manhattan_pick, absolute_pick, start_entry, he
         else:
             # offer to solve to a standard goal state if unsolvable
             error_label.config(text = "This configuration is not solvable. Would you like to solve to a standard configuration?")
-            if check_valid(start_tuple, (0, 1, 2, 3, 4, 5, 6, 7, 8))[0]:
-                standard_goal = (0, 1, 2, 3, 4, 5, 6, 7, 8)
-            else:
-                standard_goal = (1, 2, 3, 8, 0, 4, 7, 6, 5)
+            goal = standard_goal(start_tuple)
             standard_solve_yes = Button(root, text="Yes")
             standard_solve_yes.grid(row=6, column=0)
             standard_solve_no = Button(root, text="No")
             standard_solve_no.grid(row=6, column=1)
             
             standard_solve_no.config(command = lambda: reset_gui(error_label, standard_solve_yes, standard_solve_no))
-            standard_solve_yes.config(command = lambda: start_standard_algorithm(start_button, manhattan_pick, absolute_pick, start_entry, start_tuple, standard_goal, heuristic_type, goal_entry, error_label, standard_solve_no, standard_solve_yes))
+            standard_solve_yes.config(command = lambda: start_standard_algorithm(start_button, manhattan_pick, absolute_pick, start_entry, start_tuple, goal, heuristic_type, goal_entry, error_label, standard_solve_no, standard_solve_yes))
     else:
-        # if it is valid, run the algorithm and clear the GUI
+        # if it is valid, run the algorithm, and clear the GUI once it has finished
         astar = Astar(heuristic_type.get(), start_tuple, goal_tuple)
-        astar.algorithm()
-        
-        start_button.destroy()
-        start_entry.destroy()
-        manhattan_pick.destroy()
-        absolute_pick.destroy()
-        error_label.destroy()
-        goal_entry.destroy()
-        
-        labels = []
-        
-        #display the solution in a GUI
-        top_label = Label(root, text="Start")
-        top_label.grid(column=0, row=0, columnspan=3)
-
-        for i in range(3):
-            for j in range(3):
-                b = Button(root, text=astar.start[3*i+j])
-                b.grid(row=i+1, column=j)
-                labels.append(b)
-        labels.append(top_label)
-                
-        next_button = Button(root, text="Next", command=lambda: astar.next_stage(labels))
-        next_button.grid(row=1, column=4)
-        prev_button = Button(root, text="Prev", command=lambda: astar.prev_stage(labels))  
-        prev_button.grid(row=2, column=4) 
+        solve_in_background(astar, [start_button, start_entry, manhattan_pick, absolute_pick, error_label, goal_entry],
+                            start_button, error_label)
  
         
-# set up the GUI
-root = Tk()
+if __name__ == "__main__":
+    # set up the GUI
+    root = Tk()
 
-start_entry = Entry(root, text="Starting Configuration")
-start_entry.grid(row=0, column=0)
-goal_entry = Entry(root, text="Goal Configuration")
-goal_entry.grid(row=1, column=0)
+    start_entry = Entry(root, text="Starting Configuration")
+    start_entry.grid(row=0, column=0)
+    goal_entry = Entry(root, text="Goal Configuration")
+    goal_entry.grid(row=1, column=0)
 
-heuristic_type = StringVar()
-heuristic_type.set("manhattan")
-manhattan_pick = Radiobutton(root, text="Manhattan", variable=heuristic_type, value="manhattan")
-manhattan_pick.grid(row=2, column=0)
-absolute_pick = Radiobutton(root, text="Euclidean", variable=heuristic_type, value="absolute")
-absolute_pick.grid(row=3, column=0)
+    heuristic_type = StringVar()
+    heuristic_type.set("manhattan")
+    manhattan_pick = Radiobutton(root, text="Manhattan", variable=heuristic_type, value="manhattan")
+    manhattan_pick.grid(row=2, column=0)
+    absolute_pick = Radiobutton(root, text="Euclidean", variable=heuristic_type, value="absolute")
+    absolute_pick.grid(row=3, column=0)
 
-error_label = Label(root, text="", fg="red")
-error_label.grid(row=5, column=0, columnspan=5)
+    error_label = Label(root, text="", fg="red")
+    error_label.grid(row=5, column=0, columnspan=5)
 
-start_button = Button(root, text="Start", command=lambda: start_algorithm(start_button, manhattan_pick, absolute_pick,
-                                                                          start_entry, heuristic_type, goal_entry,
-                                                                          error_label))
-start_button.grid(row=4, column=0)
+    start_button = Button(root, text="Start", command=lambda: start_algorithm(start_button, manhattan_pick, absolute_pick,
+                                                                              start_entry, heuristic_type, goal_entry,
+                                                                              error_label))
+    start_button.grid(row=4, column=0)
 
 
-root.mainloop()
\ No newline at end of file
+    root.mainloop()
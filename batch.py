@@ -0,0 +1,198 @@
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from os import cpu_count
+from time import time
+
+from distance_oracle import ORACLE_CELLS
+from solve_cache import SolveCache
+from solver import Astar, check_valid
+
+# the letter written for each move code, the direction the blank moves in
+MOVE_LETTERS = "ULRD"
+
+# each worker process's cache of solutions, made when it is first needed
+CACHE = None
+
+
+def parse_config(text):
+    """
+    read a configuration written as comma separated tiles, or as a string of digits for boards of up to
+    10 cells, e.g. '7,2,4,5,0,6,8,3,1' or '724506831'
+    """
+    if "," in text:
+        return tuple(int(tile) for tile in text.split(","))
+    return tuple(int(tile) for tile in text)
+
+
+def read_instances(file):
+    """
+    read the instances from a file one line at a time, so that the whole file is never held in memory.
+    each line holds a start and a goal configuration separated by whitespace, and blank lines and
+    lines starting with '#' are skipped. yields the line number and the text of the start and goal
+
+    parameters:
+    - file: an open text file
+    """
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+        yield number, line.split()
+
+
+def solve_instance(number, fields, heuristic_type, frontier, board, columns, search, path=False, cache=False, stats=False,
+                   weight=None, time_limit=None):
+    """
+    check and solve one instance, and return the result as a dictionary. this runs in the worker
+    processes, which each keep their own heuristic tables between instances
+
+    parameters:
+    - number: the line number of the instance
+    - fields: the text of the start and goal configurations
+    - path: whether to include every configuration on the solution path, rather than only the moves
+    - cache: whether to keep solutions in memory, so instances that are the same as one the worker has
+      already solved, or a symmetry or relabelling of one, are not searched again
+    - stats: whether to include everything the search counted, see solver.SearchStats
+    - the rest are passed on to Astar
+    """
+    global CACHE
+
+    result = {"line": number}
+
+    if len(fields) != 2:
+        result["error"] = "invalid"
+        return result
+    try:
+        start = parse_config(fields[0])
+        goal = parse_config(fields[1])
+    except ValueError:
+        result["error"] = "invalid"
+        return result
+
+    result["start"] = list(start)
+    result["goal"] = list(goal)
+
+    # invalid or unsolvable instances are reported rather than searched
+    valid, reason = check_valid(start, goal, columns)
+    if not valid:
+        result["error"] = reason
+        return result
+
+    # the distance oracle only has tables for small boards
+    if search == "oracle" and len(start) > ORACLE_CELLS:
+        result["error"] = "too large for the oracle"
+        return result
+
+    # the backward side of a bidirectional search would need a pattern database for every start
+    if search == "bidirectional" and heuristic_type == "pdb":
+        result["error"] = "pdb with bidirectional"
+        return result
+
+    if cache and CACHE is None:
+        CACHE = SolveCache()
+
+    start_time = time()
+    astar = Astar(heuristic_type, start, goal, frontier, board, columns, search, CACHE if cache else None,
+                  weight=weight, time_limit=time_limit)
+    astar.algorithm()
+
+    # a search that is stopped early, or runs out of nodes, finds no solution
+    if astar.moves is None:
+        result["moves"] = None
+    else:
+        result["moves"] = len(astar.moves)
+        result["directions"] = "".join(MOVE_LETTERS[move] for move in astar.moves)
+        # a weighted or anytime search may not find the shortest solution, only one at most this many times as long
+        if astar.suboptimality != 1:
+            result["suboptimality"] = astar.suboptimality
+        if path:
+            result["path"] = [list(config) for config in astar.path()]
+    result["expanded"] = astar.expanded
+    if stats:
+        result["stats"] = astar.stats.as_dict()
+    result["time"] = time()-start_time
+    return result
+
+
+def solve_batch(instances, heuristic_type="manhattan", frontier="heap", board="packed", columns=None,
+                search="astar", workers=None, window=None, path=False, cache=False, stats=False, weight=None, time_limit=None):
+    """
+    solve instances in a pool of processes, and yield the results in the order they finish.
+    only 'window' instances are handed to the pool at once, and the next is read as each one
+    finishes, so the memory used does not grow with the number of instances
+
+    parameters:
+    - instances: an iterable of (line number, [start text, goal text]), as from read_instances
+    - heuristic_type, frontier, board, columns, search, weight, time_limit: passed on to Astar
+    - path: whether to include every configuration on each solution path
+    - cache: whether each worker keeps the solutions it has found in memory, see solve_instance
+    - stats: whether to include everything each search counted
+    - workers: the number of processes. if None, one per CPU
+    - window: the most instances in flight at once. if None, four per worker
+    """
+
+    if workers is None:
+        workers = cpu_count() or 1
+    if window is None:
+        window = 4*workers
+
+    instances = iter(instances)
+    with ProcessPoolExecutor(workers) as pool:
+        # the line number of each instance in flight, by its future
+        pending = {}
+        finished_reading = False
+        while True:
+            # top up the instances in flight
+            while not finished_reading and len(pending) < window:
+                instance = next(instances, None)
+                if instance is None:
+                    finished_reading = True
+                    break
+                number, fields = instance
+                future = pool.submit(solve_instance, number, fields, heuristic_type, frontier, board, columns, search, path, cache, stats,
+                                     weight, time_limit)
+                pending[future] = number
+
+            if len(pending) == 0:
+                return
+
+            done = wait(pending, return_when=FIRST_COMPLETED)[0]
+            for future in done:
+                number = pending.pop(future)
+                # an instance that fails is reported on its own line, so the rest of the batch is still solved
+                try:
+                    result = future.result()
+                except Exception as error:
+                    result = {"line": number, "error": type(error).__name__ + ": " + str(error)}
+                yield result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a file of sliding puzzle instances, writing one JSON result per line.")
+    parser.add_argument("input", help="file of 'start goal' lines, or - for standard input")
+    parser.add_argument("-o", "--output", help="file to write the results to, instead of standard output")
+    parser.add_argument("--heuristic", default="manhattan")
+    parser.add_argument("--frontier", default="heap", choices=["heap", "list"])
+    parser.add_argument("--board", default="packed", choices=["tuple", "packed"])
+    parser.add_argument("--columns", type=int, default=None, help="the width of the boards, if they are not square")
+    parser.add_argument("--search", default="astar", choices=["astar", "ida", "bidirectional", "anytime", "oracle"])
+    parser.add_argument("--weight", type=float, default=None, help="find solutions at most this many times the shortest, faster")
+    parser.add_argument("--time-limit", type=float, default=None, help="seconds an anytime search keeps improving each solution for")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--path", action="store_true", help="write every configuration on each solution path, not only the moves")
+    parser.add_argument("--cache", action="store_true", help="reuse the solutions of repeated or symmetric instances")
+    parser.add_argument("--stats", action="store_true", help="write the nodes generated, duplicates, peak frontier and so on of each search")
+    args = parser.parse_args()
+
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    output_file = sys.stdout if args.output is None else open(args.output, "w")
+
+    with input_file, output_file:
+        results = solve_batch(read_instances(input_file), args.heuristic, args.frontier, args.board,
+                              args.columns, args.search, args.workers, path=args.path, cache=args.cache, stats=args.stats,
+                              weight=args.weight, time_limit=args.time_limit)
+        for result in results:
+            output_file.write(json.dumps(result) + "\n")
+            output_file.flush()
@@ -0,0 +1,82 @@
+from random import Random
+from sys import getsizeof
+from time import time
+
+from instances import SEED, random_walk
+from solver import Astar
+
+# the (frontier, board) pairs to compare, the original linear scan and 9-tuples first
+ENGINES = [("list", "tuple"), ("heap", "tuple"), ("heap", "packed")]
+HEURISTIC_TYPE = "manhattan"
+HEURISTICS = ["manhattan", "euclidean", "linear_conflict", "walking_distance", "pdb"]
+GOAL = (0, 1, 2, 3, 4, 5, 6, 7, 8)
+
+# the instance from astar.py, plus some seeded random walks from the goal
+INSTANCES = [(7, 2, 4, 5, 0, 6, 8, 3, 1)]
+SCRAMBLES = 10
+SCRAMBLE_LENGTH = 60
+
+
+def run(engine, start, heuristic_type=HEURISTIC_TYPE):
+    """
+    solve one instance, and return the number of moves, the number of nodes expanded and generated,
+    the time taken, and the total size in bytes of the stored configurations
+    """
+    frontier, board = engine
+    astar = Astar(heuristic_type, start, GOAL, frontier, board)
+    start_time = time()
+    astar.algorithm()
+    elapsed = time()-start_time
+    size = sum(getsizeof(config) for config in astar.configurations)
+    return len(astar.moves), astar.expanded, len(astar.configurations), elapsed, size
+
+
+def name(engine):
+    return engine[0] + "/" + engine[1]
+
+
+def main():
+    """
+    time every engine, then every heuristic, on the instances. nothing runs when this file is imported
+    """
+    rng = Random(SEED)
+    instances = INSTANCES + [random_walk(GOAL, SCRAMBLE_LENGTH, rng) for i in range(SCRAMBLES)]
+
+    # for each engine: nodes expanded, nodes generated, seconds, bytes of configurations
+    totals = {engine: [0, 0, 0, 0] for engine in ENGINES}
+    print("instance".ljust(30) + "moves".rjust(6) + "expanded".rjust(10) + "".join(name(engine).rjust(14) for engine in ENGINES))
+    for start in instances:
+        results = [run(engine, start) for engine in ENGINES]
+
+        # every engine must find a solution of the same length
+        assert len(set(result[0] for result in results)) == 1, start
+        for engine, result in zip(ENGINES, results):
+            for i in range(4):
+                totals[engine][i] += result[i+1]
+        print(str(start).ljust(30) + str(results[0][0]).rjust(6) + str(results[0][1]).rjust(10)
+              + "".join(("%.3f s" % result[3]).rjust(14) for result in results))
+
+    print("")
+    for engine in ENGINES:
+        expanded, generated, elapsed, size = totals[engine]
+        print(name(engine) + ": " + "%.0f" % (expanded/elapsed) + " expansions per second, "
+              + "%.0f" % (generated/elapsed) + " nodes generated per second, "
+              + "%.1f" % (size/generated) + " bytes per stored configuration")
+
+    # compare the heuristics on the same instances, with the fastest engine
+    print("")
+    print("heuristic".ljust(20) + "expanded".rjust(10) + "time".rjust(12))
+    for heuristic_type in HEURISTICS:
+        # build any tables the heuristic needs before timing it
+        Astar(heuristic_type, GOAL, GOAL, *ENGINES[-1])
+        expanded = 0
+        elapsed = 0
+        for start in instances:
+            result = run(ENGINES[-1], start, heuristic_type)
+            expanded += result[1]
+            elapsed += result[3]
+        print(heuristic_type.ljust(20) + str(expanded).rjust(10) + ("%.3f s" % elapsed).rjust(12))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import os
+import sys
+
+from pattern_database import DISTANCE_BITS, DISTANCE_MASK, PDB_DIRECTORY, UNREACHED, PatternDatabase, build_exact, save_database
+from puzzle_board import board_shape, directions, parity
+
+# the 8-puzzle goals offered by astar_generic.py
+STANDARD_GOALS = [(0, 1, 2, 3, 4, 5, 6, 7, 8), (1, 2, 3, 8, 0, 4, 7, 6, 5)]
+
+# the most cells a board can have for its table to fit in memory and be built in reasonable time. a
+# 3x3 board has 181440 entries, but a 3x4 board would have 239500800
+ORACLE_CELLS = 9
+
+# oracles already loaded, by goal and width
+ORACLES = {}
+
+
+def check_size(goal):
+    if len(goal) > ORACLE_CELLS:
+        raise ValueError("the distance oracle only works on boards of up to " + str(ORACLE_CELLS) + " cells")
+
+
+def build_oracle(goal, columns=None):
+    """
+    find the distance from the goal of every configuration that can reach it, and the direction to move
+    the blank in to get one step closer, by a breadth first search backwards from the goal. a configuration
+    is first reached from a neighbour one step closer to the goal, so the best move goes back to it. this
+    is the breadth first search of the exact pattern database, recording the moves as well
+
+    parameters:
+    - goal: a tuple containing the goal configuration
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+
+    check_size(goal)
+    return build_exact(goal, columns, record_moves=True)
+
+
+def oracle_path(goal, columns, directory=PDB_DIRECTORY):
+    name = "oracle_" + "-".join(str(tile) for tile in goal) + "_" + str(columns)
+    return os.path.join(directory, name + ".pdb")
+
+
+class DistanceOracle:
+    """
+    the distance to a goal of every configuration of a small board, with the best move from each,
+    so that a solution is found by following the moves with no search. the table is built and saved
+    the first time it is needed, and memory mapped from the file after that
+
+    parameters:
+    - goal: a tuple containing the goal configuration, of up to ORACLE_CELLS cells
+    - columns: the width of the board. if None, the board is taken to be square
+    - directory: where the table is saved
+    """
+
+    def __init__(self, goal, columns=None, directory=PDB_DIRECTORY):
+        check_size(goal)
+        self.goal = tuple(goal)
+        self.columns = board_shape(len(goal), columns)[1]
+        self.moves = directions(self.columns)
+        self.parity = parity(self.goal, self.columns)
+        self.path = oracle_path(self.goal, self.columns, directory)
+        self.database = None
+
+    def load(self):
+        """
+        load the table, building it first if it has not been saved
+        """
+        if self.database is None:
+            if not os.path.exists(self.path):
+                tiles, table = build_oracle(self.goal, self.columns)
+                save_database(self.path, self.goal, self.columns, tiles, table)
+            self.database = PatternDatabase(self.path)
+        return self.database
+
+    def distance(self, config):
+        """
+        the fewest moves from a configuration to the goal, or None if it can not reach the goal
+        """
+        # a configuration shares its entry with the one with the last two tiles swapped, which has the other parity
+        if parity(config, self.columns) != self.parity:
+            return None
+        value = self.load().lookup(config)
+        if value == UNREACHED:
+            return None
+        return value & DISTANCE_MASK
+
+    def next_move(self, config):
+        """
+        the position the blank should move to from a configuration to get one step closer to the goal,
+        or None if it is the goal or can not reach it
+        """
+        value = self.load().lookup(config)
+        if value == UNREACHED or value & DISTANCE_MASK == 0:
+            return None
+        return config.index(0) + self.moves[value >> DISTANCE_BITS]
+
+    def solve_moves(self, start):
+        """
+        return the codes of the moves of a shortest solution from the start (the directions of the blank,
+        as in puzzle_board.directions), or None if the start can not reach the goal
+        """
+        if self.distance(start) is None:
+            return None
+
+        config = list(start)
+        moves = bytearray()
+        swap = self.next_move(config)
+        while swap is not None:
+            blank_index = config.index(0)
+            moves.append(self.moves.index(swap-blank_index))
+            config[blank_index] = config[swap]
+            config[swap] = 0
+            swap = self.next_move(config)
+        return moves
+
+
+def get_oracle(goal, columns=None):
+    """
+    find the oracle for a goal, so that each goal's table is only opened once
+    """
+    key = (tuple(goal), board_shape(len(goal), columns)[1])
+    if key not in ORACLES:
+        ORACLES[key] = DistanceOracle(goal, columns)
+    return ORACLES[key]
+
+
+if __name__ == "__main__":
+    # build the tables for the goals given as comma separated tiles, or for the standard 8-puzzle goals
+    if len(sys.argv) > 1:
+        goals = [tuple(int(tile) for tile in goal.split(",")) for goal in sys.argv[1:]]
+    else:
+        goals = STANDARD_GOALS
+
+    for goal in goals:
+        oracle = get_oracle(goal)
+        oracle.load()
+        print("Table for", goal, "is in", oracle.path)
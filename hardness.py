@@ -0,0 +1,160 @@
+import argparse
+import json
+import sys
+from threading import Timer
+from time import time
+
+from distance_oracle import get_oracle
+from instances import LAYER_CELLS, SEED, SUITES, suite
+from solver import Astar
+
+# the searches to time, as the arguments given to Astar for each
+MODES = {
+    "astar": {"search": "astar"},
+    "weighted": {"search": "astar", "weight": 2},
+    "ida": {"search": "ida"},
+    "bidirectional": {"search": "bidirectional"},
+    "anytime": {"search": "anytime"},
+    "oracle": {"search": "oracle"}
+}
+HEURISTICS = ["manhattan", "euclidean", "linear_conflict", "walking_distance", "pdb"]
+DEFAULT_SUITES = ["8-depth", "8-hardest", "15-depth"]
+# the backward side of a bidirectional search with pattern databases builds a table for every start
+SKIP = [("bidirectional", "pdb")]
+
+# the seconds a search is given before it is cancelled
+TIME_LIMIT = 30
+
+# a combination is reported as slower than the saved one when it takes this many times as long
+TIME_TOLERANCE = 1.2
+
+
+def run(start, goal, columns, mode, heuristic_type, board, time_limit=TIME_LIMIT):
+    """
+    solve one instance with one search and heuristic, cancelling the search if it takes longer than
+    'time_limit' seconds, and return what it did as a dictionary
+    """
+    astar = Astar(heuristic_type, start, goal, "heap", board, columns, **MODES[mode])
+    timer = Timer(time_limit, astar.cancel)
+    timer.start()
+    start_time = time()
+    astar.algorithm()
+    elapsed = time()-start_time
+    timer.cancel()
+
+    result = {"moves": None if astar.moves is None else len(astar.moves), "expanded": astar.expanded,
+              "generated": astar.stats.generated, "peak_open": astar.stats.peak_open, "time": elapsed}
+    result["status"] = "timeout" if astar.cancelled else "ok"
+    return result
+
+
+def combinations(goal, modes, heuristics):
+    """
+    the (mode, heuristic) pairs to run on an instance. the oracle needs no heuristic, and only works on
+    boards small enough to store every configuration of
+    """
+    for mode in modes:
+        if mode == "oracle":
+            if len(goal) <= LAYER_CELLS:
+                yield mode, None
+            continue
+        for heuristic_type in heuristics:
+            if (mode, heuristic_type) not in SKIP:
+                yield mode, heuristic_type
+
+
+def run_suites(suites, modes, heuristics, board="packed", seed=SEED, time_limit=TIME_LIMIT):
+    """
+    time every combination on every instance of the suites, and return the results. a search that should
+    find a shortest solution but finds a longer one than the known shortest is marked "wrong"
+    """
+    results = []
+    for name in suites:
+        for number, (start, goal, columns, length) in enumerate(suite(name, seed)):
+            for mode, heuristic_type in combinations(goal, modes, heuristics):
+                # build any tables the heuristic or oracle needs before timing it
+                Astar(heuristic_type, goal, goal, "heap", board, columns)
+                if mode == "oracle":
+                    get_oracle(goal, columns).load()
+
+                result = run(start, goal, columns, mode, heuristic_type, board, time_limit)
+                if result["status"] == "ok" and mode != "weighted" and length is not None and result["moves"] != length:
+                    result["status"] = "wrong"
+                result.update({"suite": name, "instance": number, "mode": mode, "heuristic": heuristic_type,
+                               "board": board, "start": list(start), "goal": list(goal), "shortest": length})
+                results.append(result)
+                if result["status"] != "ok":
+                    print(result["status"].upper(), name, number, mode, heuristic_type, file=sys.stderr)
+    return results
+
+
+def key(result):
+    return (result["suite"], result["mode"], str(result["heuristic"]))
+
+
+def totals(results):
+    """
+    add up the results of each (suite, mode, heuristic) combination: the instances solved, the nodes
+    expanded and the time taken, in the order they were first run
+    """
+    total = {}
+    for result in results:
+        combination = total.setdefault(key(result), {"solved": 0, "count": 0, "expanded": 0, "time": 0})
+        combination["count"] += 1
+        combination["solved"] += result["status"] == "ok"
+        combination["expanded"] += result["expanded"]
+        combination["time"] += result["time"]
+    return total
+
+
+def report(results, baseline=None):
+    """
+    print the totals of each combination, and if the results of an earlier run are given, how the nodes
+    expanded and the time taken have changed since then
+    """
+    current = totals(results)
+    previous = totals(baseline) if baseline is not None else {}
+
+    print("suite".ljust(12) + "mode".ljust(15) + "heuristic".ljust(20) + "solved".rjust(8)
+          + "expanded".rjust(12) + "time".rjust(12) + ("change".rjust(18) if baseline is not None else ""))
+    for combination, total in current.items():
+        line = (combination[0].ljust(12) + combination[1].ljust(15) + combination[2].ljust(20)
+                + (str(total["solved"]) + "/" + str(total["count"])).rjust(8)
+                + str(total["expanded"]).rjust(12) + ("%.3f s" % total["time"]).rjust(12))
+        old = previous.get(combination)
+        if old is not None:
+            change = "%+.0f%% time" % (100*(total["time"]/old["time"] - 1)) if old["time"] > 0 else ""
+            if total["expanded"] != old["expanded"]:
+                change += ", %+d nodes" % (total["expanded"] - old["expanded"])
+            if total["time"] > TIME_TOLERANCE*old["time"] and total["time"] > 0.01:
+                change = "SLOWER " + change
+            line += change.rjust(18)
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every search and heuristic on seeded suites of instances of known difficulty.")
+    parser.add_argument("--suites", nargs="+", default=DEFAULT_SUITES, choices=SUITES)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--heuristics", nargs="+", default=HEURISTICS)
+    parser.add_argument("--board", default="packed", choices=["tuple", "packed"])
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT, help="seconds before a search is cancelled")
+    parser.add_argument("--save", help="file to save the results of this run to")
+    parser.add_argument("--compare", help="file of saved results to compare this run against")
+    args = parser.parse_args()
+
+    results = run_suites(args.suites, args.modes, args.heuristics, args.board, args.seed, args.time_limit)
+
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baseline = [json.loads(line) for line in file]
+    report(results, baseline)
+
+    if args.save is not None:
+        with open(args.save, "w") as file:
+            for result in results:
+                file.write(json.dumps(result) + "\n")
+
+    sys.exit(1 if any(result["status"] == "wrong" for result in results) else 0)
@@ -0,0 +1,317 @@
+from math import sqrt
+
+from pattern_database import PatternDatabases
+from puzzle_board import Heuristic, board_shape, neighbour_table
+
+# heuristics already built, by (heuristic_type, goal, columns), as their tables only depend on those
+HEURISTIC_CACHE = {}
+
+# the most rows or columns a board can have for its walking distance tables to be built. a 4x4 board has
+# 24964 states in each direction and takes a fraction of a second, but a 5x5 board runs out of memory
+WALKING_LINES = 4
+
+
+def heuristic_table(heuristic_type, goal, columns=3):
+    """
+    build a table of the distance heuristic for every tile in every cell, so that
+    table[tile][cell] is how far the tile has to travel from that cell to its place in the goal.
+    the blank tile is not counted: it moves with every tile, so counting it as well would
+    overestimate the moves left, and the search could return a longer solution than needed
+
+    parameters:
+    - heuristic_type: "manhattan", or "absolute"/"euclidean" for the straight line distance.
+      any other value gives a heuristic of 0, which is trivially admissible
+    - goal: a tuple containing the goal configuration
+    - columns: the width of the board
+    """
+
+    # the position in which each tile should end up
+    position = {goal[i]: divmod(i, columns) for i in range(len(goal))}
+
+    table = []
+    for tile in range(len(goal)):
+        row = []
+        for cell in range(len(goal)):
+            goal_position = position[tile]
+            actual_position = divmod(cell, columns)
+            if tile == 0:
+                row.append(0)
+            elif heuristic_type in ("absolute", "euclidean"):
+                row.append(sqrt((goal_position[0]-actual_position[0])**2+(goal_position[1]-actual_position[1])**2))
+            elif heuristic_type == "manhattan":
+                row.append(abs(goal_position[0]-actual_position[0])+abs(goal_position[1]-actual_position[1]))
+            else:
+                row.append(0)
+        table.append(row)
+
+    return table
+
+
+def delta_table(table, swaps):
+    """
+    build a table of how the heuristic changes with each move, so that deltas[blank_index][swap][tile]
+    is the change when 'tile' moves from 'swap' into the blank space. only the moved tile and the
+    blank change places, so this is all that needs looking up to find the heuristic of a child
+
+    parameters:
+    - table: a heuristic table, from heuristic_table
+    - swaps: the neighbour table of the board
+    """
+
+    deltas = {}
+    for blank_index in swaps:
+        deltas[blank_index] = {}
+        for swap in swaps[blank_index]:
+            deltas[blank_index][swap] = [
+                table[tile][blank_index] - table[tile][swap] + table[0][swap] - table[0][blank_index]
+                for tile in range(len(table))
+            ]
+    return deltas
+
+
+class TableHeuristic(Heuristic):
+    """
+    the sum over every tile of a distance from its goal position, read from a table
+
+    parameters:
+    - heuristic_type: "manhattan", "absolute"/"euclidean", or anything else for 0
+    - goal: a tuple containing the goal configuration
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+
+    needs_config = False
+
+    def __init__(self, heuristic_type, goal, columns=None):
+        rows, columns = board_shape(len(goal), columns)
+        self.table = heuristic_table(heuristic_type, goal, columns)
+        self.deltas = delta_table(self.table, neighbour_table(rows, columns))
+
+    def evaluate(self, config):
+        table = self.table
+        total = 0
+        for i in range(len(config)):
+            total += table[config[i]][i]
+        return total
+
+    def update(self, h, config, blank_index, swap, tile):
+        return h + self.deltas[blank_index][swap][tile]
+
+
+def longest_increasing(sequence):
+    """
+    find the length of the longest increasing subsequence of a short sequence
+    """
+    lengths = []
+    for i in range(len(sequence)):
+        lengths.append(1 + max([lengths[j] for j in range(i) if sequence[j] < sequence[i]], default=0))
+    return max(lengths, default=0)
+
+
+class LinearConflict(Heuristic):
+    """
+    the manhattan distance of the tiles (not counting the blank), plus two moves for each tile that has to
+    leave its row or column to let another tile past. two tiles conflict when both are in their goal row
+    (or column) but in the wrong order, and one of them has to move out of the way and back
+
+    the conflicts in a row or column only depend on the tiles in it, so they are kept in a table for each
+    row and column, filled in the first time each arrangement of tiles is seen. a move changes the tiles in
+    only two rows or two columns, so only those are looked up for each child
+
+    parameters:
+    - goal: a tuple containing the goal configuration
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+
+    def __init__(self, goal, columns=None):
+        self.cells = len(goal)
+        self.rows, self.columns = board_shape(self.cells, columns)
+
+        self.manhattan = TableHeuristic("manhattan", goal, self.columns)
+
+        self.goal_row = {goal[i]: i // self.columns for i in range(self.cells)}
+        self.goal_column = {goal[i]: i % self.columns for i in range(self.cells)}
+        self.row_conflicts = [{} for i in range(self.rows)]
+        self.column_conflicts = [{} for i in range(self.columns)]
+
+    def row_value(self, row, line):
+        """
+        the extra moves for the conflicts in a row, given the tiles in it from left to right
+        """
+        value = self.row_conflicts[row].get(line)
+        if value is None:
+            # the goal columns of the tiles that belong in this row, in the order they are in
+            order = [self.goal_column[tile] for tile in line if tile != 0 and self.goal_row[tile] == row]
+            value = 2*(len(order) - longest_increasing(order))
+            self.row_conflicts[row][line] = value
+        return value
+
+    def column_value(self, column, line):
+        """
+        the extra moves for the conflicts in a column, given the tiles in it from top to bottom
+        """
+        value = self.column_conflicts[column].get(line)
+        if value is None:
+            order = [self.goal_row[tile] for tile in line if tile != 0 and self.goal_column[tile] == column]
+            value = 2*(len(order) - longest_increasing(order))
+            self.column_conflicts[column][line] = value
+        return value
+
+    def evaluate(self, config):
+        columns = self.columns
+        total = self.manhattan.evaluate(config)
+        for row in range(self.rows):
+            total += self.row_value(row, tuple(config[row*columns:(row+1)*columns]))
+        for column in range(columns):
+            total += self.column_value(column, tuple(config[column::columns]))
+        return total
+
+    def update(self, h, config, blank_index, swap, tile):
+        columns = self.columns
+        h = self.manhattan.update(h, config, blank_index, swap, tile)
+
+        if abs(blank_index - swap) == columns:
+            # a vertical move keeps the order of every column, but changes two rows
+            for cell, new_tile in ((swap, 0), (blank_index, tile)):
+                row = cell // columns
+                line = config[row*columns:(row+1)*columns]
+                new_line = list(line)
+                new_line[cell % columns] = new_tile
+                h += self.row_value(row, tuple(new_line)) - self.row_value(row, tuple(line))
+        else:
+            # a horizontal move keeps the order of every row, but changes two columns
+            for cell, new_tile in ((swap, 0), (blank_index, tile)):
+                column = cell % columns
+                line = config[column::columns]
+                new_line = list(line)
+                new_line[cell // columns] = new_tile
+                h += self.column_value(column, tuple(new_line)) - self.column_value(column, tuple(line))
+        return h
+
+
+def walking_table(line_of_cell, class_of_tile, lines, goal):
+    """
+    build the table for one direction of the walking distance. a state counts, for each line (row or column),
+    how many of its tiles belong in each line, and which line the blank is in. each move of the blank to the
+    next line takes one tile from that line into the blank's line, and a breadth first search from the goal
+    state finds the fewest moves to reach every state
+
+    a state is packed into an int, with 4 bits for the count of each (line, goal line) pair and the line of
+    the blank above them, and fields[cell][tile] is what a tile in a cell adds to it
+
+    parameters:
+    - line_of_cell: the line each cell is in
+    - class_of_tile: the line each tile belongs in
+    - lines: the number of lines
+    - goal: a tuple containing the goal configuration
+    """
+
+    blank_shift = 4*lines*lines
+    fields = []
+    for cell in range(len(goal)):
+        fields.append([line_of_cell[cell] << blank_shift if tile == 0
+                       else 1 << (4*(line_of_cell[cell]*lines + class_of_tile[tile]))
+                       for tile in range(len(goal))])
+
+    start = sum(fields[cell][goal[cell]] for cell in range(len(goal)))
+    distances = {start: 0}
+    layer = [start]
+    distance = 0
+    while len(layer) > 0:
+        distance += 1
+        next_layer = []
+        for state in layer:
+            blank_line = state >> blank_shift
+            for line in (blank_line-1, blank_line+1):
+                if line < 0 or line >= lines:
+                    continue
+                for goal_line in range(lines):
+                    # move a tile that belongs in goal_line from the next line into the blank's line
+                    if (state >> (4*(line*lines + goal_line))) & 15 == 0:
+                        continue
+                    new_state = (state - (1 << (4*(line*lines + goal_line))) + (1 << (4*(blank_line*lines + goal_line)))
+                                 + ((line - blank_line) << blank_shift))
+                    if new_state not in distances:
+                        distances[new_state] = distance
+                        next_layer.append(new_state)
+        layer = next_layer
+
+    return fields, distances
+
+
+class WalkingDistance(Heuristic):
+    """
+    the walking distance: the fewest vertical moves needed if tiles only had to reach their goal rows, and
+    could swap with any tile in the next row, plus the same for horizontal moves and goal columns. every
+    move is counted in one of the two, so it never overestimates, and it counts tiles that have to pass
+    each other, which the manhattan distance does not
+
+    both tables are built once for the goal, for boards of up to WALKING_LINES rows and columns. a move only
+    changes the state in its own direction, so one table is looked up twice for each child, but the state
+    before the move is not kept with the configuration, so it is added up again from every cell. this makes
+    an update cost about as much as the linear conflict's, several times the manhattan distance's
+
+    parameters:
+    - goal: a tuple containing the goal configuration
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+
+    def __init__(self, goal, columns=None):
+        self.cells = len(goal)
+        self.rows, self.columns = board_shape(self.cells, columns)
+        if self.rows > WALKING_LINES or self.columns > WALKING_LINES:
+            raise ValueError("the walking distance only works on boards of up to " + str(WALKING_LINES) + " rows and columns")
+        goal_row = {goal[i]: i // self.columns for i in range(self.cells)}
+        goal_column = {goal[i]: i % self.columns for i in range(self.cells)}
+
+        self.vertical_fields, self.vertical = walking_table(
+            [cell // self.columns for cell in range(self.cells)], goal_row, self.rows, goal)
+        self.horizontal_fields, self.horizontal = walking_table(
+            [cell % self.columns for cell in range(self.cells)], goal_column, self.columns, goal)
+
+    def evaluate(self, config):
+        vertical = sum(self.vertical_fields[i][config[i]] for i in range(self.cells))
+        horizontal = sum(self.horizontal_fields[i][config[i]] for i in range(self.cells))
+        return self.vertical[vertical] + self.horizontal[horizontal]
+
+    def update(self, h, config, blank_index, swap, tile):
+        if abs(blank_index - swap) == self.columns:
+            fields, distances = self.vertical_fields, self.vertical
+        else:
+            fields, distances = self.horizontal_fields, self.horizontal
+
+        state = sum(fields[i][config[i]] for i in range(self.cells))
+        new_state = state - fields[swap][tile] + fields[blank_index][tile] - fields[blank_index][0] + fields[swap][0]
+        return h + distances[new_state] - distances[state]
+
+
+def make_heuristic(heuristic_type, goal, columns=None, cache=True):
+    """
+    find the heuristic to use for a goal
+
+    parameters:
+    - heuristic_type: "manhattan", "absolute"/"euclidean", "pdb", "linear_conflict" or "walking_distance",
+      or a Heuristic object, which is used as it is. None or any other string gives a heuristic of 0
+    - goal: a tuple containing the goal configuration
+    - columns: the width of the board. if None, the board is taken to be square
+    - cache: whether to keep the heuristic for later searches to the same goal. goals that are only
+      searched for once, such as the start of a bidirectional search, should not fill the cache
+    """
+
+    if heuristic_type is not None and not isinstance(heuristic_type, str):
+        return heuristic_type
+
+    key = (heuristic_type, tuple(goal), columns)
+    if key in HEURISTIC_CACHE:
+        return HEURISTIC_CACHE[key]
+
+    if heuristic_type == "pdb":
+        heuristic = PatternDatabases(goal, columns)
+    elif heuristic_type == "linear_conflict":
+        heuristic = LinearConflict(goal, columns)
+    elif heuristic_type == "walking_distance":
+        heuristic = WalkingDistance(goal, columns)
+    else:
+        heuristic = TableHeuristic(heuristic_type, goal, columns)
+    if cache:
+        HEURISTIC_CACHE[key] = heuristic
+    return heuristic
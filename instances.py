@@ -0,0 +1,203 @@
+import argparse
+import sys
+from random import Random
+
+from puzzle_board import board_shape, neighbour_table, parity
+from solver import Astar
+
+# the distances from a goal of every configuration that can reach it, for boards small enough to search
+# completely, kept as lists of the configurations at each distance, by (goal, columns)
+LAYERS = {}
+LAYER_CELLS = 9
+
+# the first instances of Korf's 100 random 15-puzzle instances ("Depth-first iterative-deepening", 1985),
+# solved to the goal with the blank first, with their published optimal solution lengths
+KORF_GOAL = tuple(range(16))
+KORF_15 = [
+    ((14, 13, 15, 7, 11, 12, 9, 5, 6, 0, 2, 1, 4, 8, 10, 3), 57),
+    ((13, 5, 4, 10, 9, 12, 8, 14, 2, 3, 7, 1, 0, 15, 11, 6), 55),
+    ((14, 7, 8, 2, 13, 11, 10, 4, 9, 12, 5, 0, 3, 6, 1, 15), 59),
+    ((5, 12, 10, 7, 15, 11, 14, 0, 8, 2, 1, 13, 3, 4, 9, 6), 56),
+    ((4, 7, 14, 13, 10, 3, 9, 12, 11, 5, 6, 15, 1, 2, 8, 0), 56),
+    ((14, 7, 1, 9, 12, 3, 6, 15, 8, 11, 2, 5, 10, 0, 4, 13), 52),
+    ((2, 11, 15, 5, 13, 4, 6, 7, 12, 8, 10, 1, 9, 3, 14, 0), 52),
+    ((12, 11, 15, 3, 8, 0, 4, 2, 6, 13, 9, 5, 14, 1, 10, 7), 50),
+    ((3, 14, 9, 11, 5, 4, 8, 2, 13, 12, 6, 7, 10, 1, 15, 0), 46),
+    ((13, 11, 8, 9, 0, 15, 7, 10, 4, 3, 6, 14, 5, 12, 2, 1), 59)
+]
+
+# the goals of the named suites
+GOAL_8 = (1, 2, 3, 4, 5, 6, 7, 8, 0)
+GOAL_15 = tuple(list(range(1, 16)) + [0])
+SEED = 2423
+
+
+def random_solvable(goal, rng, columns=None):
+    """
+    make a configuration chosen uniformly from every configuration that can reach the goal. a random
+    arrangement of the tiles reaches it half the time, and swapping two tiles other than the blank
+    changes the parity, so the other half are fixed by swapping the first two tiles
+
+    parameters:
+    - goal: a tuple containing the goal configuration
+    - rng: the random number generator to use
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+    columns = board_shape(len(goal), columns)[1]
+    config = list(goal)
+    rng.shuffle(config)
+    if parity(config, columns) != parity(goal, columns):
+        first, second = [cell for cell in range(len(config)) if config[cell] != 0][:2]
+        config[first], config[second] = config[second], config[first]
+    return tuple(config)
+
+
+def random_walk(goal, moves, rng, columns=None):
+    """
+    make a configuration by moving the blank tile randomly away from the goal, never undoing the last move,
+    so it usually ends up nearly as many moves away as it made
+
+    parameters:
+    - goal: the configuration to start from
+    - moves: the number of random moves to make
+    - rng: the random number generator to use
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+    rows, columns = board_shape(len(goal), columns)
+    swaps = neighbour_table(rows, columns)
+    config = list(goal)
+    blank_index = config.index(0)
+    previous = None
+    for i in range(moves):
+        swap = rng.choice([cell for cell in swaps[blank_index] if cell != previous])
+        config[blank_index] = config[swap]
+        config[swap] = 0
+        previous, blank_index = blank_index, swap
+    return tuple(config)
+
+
+def distance_layers(goal, columns=None):
+    """
+    find every configuration that can reach the goal, by a breadth first search from it, and return them
+    as a list of the configurations at each distance, in the order they were found
+
+    parameters:
+    - goal: a tuple containing the goal configuration
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+    rows, columns = board_shape(len(goal), columns)
+    key = (tuple(goal), columns)
+    if key not in LAYERS:
+        swaps = neighbour_table(rows, columns)
+        seen = {tuple(goal)}
+        layers = [[tuple(goal)]]
+        while True:
+            next_layer = []
+            for config in layers[-1]:
+                blank_index = config.index(0)
+                for swap in swaps[blank_index]:
+                    new_config = list(config)
+                    new_config[blank_index] = new_config[swap]
+                    new_config[swap] = 0
+                    new_config = tuple(new_config)
+                    if new_config not in seen:
+                        seen.add(new_config)
+                        next_layer.append(new_config)
+            if len(next_layer) == 0:
+                break
+            layers.append(next_layer)
+        LAYERS[key] = layers
+    return LAYERS[key]
+
+
+def optimal_length(start, goal, columns=None):
+    """
+    find the length of the shortest solution, with IDA* and the linear conflict heuristic
+    """
+    astar = Astar("linear_conflict", start, goal, columns=columns, search="ida")
+    astar.algorithm()
+    return len(astar.moves)
+
+
+def instances_at_depth(goal, depth, count, seed=SEED, columns=None):
+    """
+    make 'count' different configurations whose shortest solution to the goal is exactly 'depth' moves. on
+    boards of up to LAYER_CELLS cells they are chosen uniformly from every configuration at that depth (fewer
+    are returned if there are not that many), and on larger boards random walks of 'depth' moves are made
+    until enough of them have no shorter way back, which is checked by solving them. fewer of the walks
+    are that far from the goal the longer they are, so on larger boards this is only practical for depths
+    up to about 35
+
+    parameters:
+    - goal: a tuple containing the goal configuration
+    - depth: the length of the shortest solutions
+    - count: the number of configurations to make
+    - seed: the seed of the random number generator, so the same instances are made every time
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+    rng = Random(seed)
+    if len(goal) <= LAYER_CELLS:
+        layers = distance_layers(goal, columns)
+        if depth >= len(layers):
+            return []
+        return rng.sample(layers[depth], min(count, len(layers[depth])))
+
+    found = []
+    while len(found) < count:
+        start = random_walk(goal, depth, rng, columns)
+        if start not in found and optimal_length(start, goal, columns) == depth:
+            found.append(start)
+    return found
+
+
+def hardest(goal, columns=None):
+    """
+    find the configurations furthest from the goal, and how far they are, on a board of up to LAYER_CELLS
+    cells. for the standard 8-puzzle goal these are the two 31 move instances
+    """
+    layers = distance_layers(goal, columns)
+    return layers[-1], len(layers)-1
+
+
+def suite(name, seed=SEED):
+    """
+    make one of the named sets of instances, as a list of (start, goal, columns, shortest solution length),
+    where the length is None if it is not known. the same seed always makes the same instances
+
+    - "8-depth": three 8-puzzles at each depth from 4 to 28 in steps of 4
+    - "8-hardest": every 8-puzzle as far as possible from the goal
+    - "8-random": twenty uniformly random solvable 8-puzzles
+    - "15-depth": two 15-puzzles at each depth from 10 to 30 in steps of 5
+    - "15-korf": the first ten of Korf's 15-puzzle instances, which take a long time to solve optimally
+    """
+    rng = Random(seed)
+    if name == "8-depth":
+        return [(start, GOAL_8, 3, depth) for depth in range(4, 29, 4)
+                for start in instances_at_depth(GOAL_8, depth, 3, seed + depth)]
+    if name == "8-hardest":
+        starts, depth = hardest(GOAL_8)
+        return [(start, GOAL_8, 3, depth) for start in starts]
+    if name == "8-random":
+        return [(random_solvable(GOAL_8, rng), GOAL_8, 3, None) for i in range(20)]
+    if name == "15-depth":
+        return [(start, GOAL_15, 4, depth) for depth in range(10, 31, 5)
+                for start in instances_at_depth(GOAL_15, depth, 2, seed + depth)]
+    if name == "15-korf":
+        return [(start, KORF_GOAL, 4, length) for start, length in KORF_15]
+    raise ValueError("unknown suite " + name)
+
+
+SUITES = ["8-depth", "8-hardest", "8-random", "15-depth", "15-korf"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a seeded set of solvable instances, as 'start goal' lines for batch.py.")
+    parser.add_argument("suite", choices=SUITES)
+    parser.add_argument("-o", "--output", help="file to write the instances to, instead of standard output")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    output_file = sys.stdout if args.output is None else open(args.output, "w")
+    with output_file:
+        for start, goal, columns, length in suite(args.suite, args.seed):
+            output_file.write(",".join(str(tile) for tile in start) + " " + ",".join(str(tile) for tile in goal) + "\n")
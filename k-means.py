@@ -1,10 +1,26 @@
 from sklearn.datasets import load_digits
 from sklearn.decomposition import PCA
-from random import randint
-from math import sqrt, inf
+from math import inf
 import numpy as np
 import matplotlib.pyplot as plt
 
+# the number of points whose distances to the centroids are worked out at once, so the memory used
+# stays the same however many points there are
+CHUNK_SIZE = 65536
+
+# with more clusters than this, the points in each cluster are summed with one bincount over (cluster, column)
+# pairs, which takes the same time however many clusters there are. with fewer, multiplying by a matrix with a
+# 1 in the row of each point's cluster is faster, as the matrix is small: on 65536 x 64 points it takes 4 ms
+# for 8 clusters against 35 ms for the bincount, but 190 ms for 1024 clusters against 46 ms
+GROUPED_SUM_CLUSTERS = 64
+
+# k-means stops once no centroid moves further than this in an iteration
+TOLERANCE = 1e-4
+
+# for k-means||, the number of rounds of sampling, and the points sampled in each round, per cluster
+PARALLEL_ROUNDS = 5
+OVERSAMPLING = 2
+
 def distance(a, b):
     """
     Return the distance between two vectors
@@ -13,56 +29,408 @@ def distance(a, b):
     """
     return np.linalg.norm(b-a)
 
-def average(a):
+def squared_distances(data, centroids, norms):
+    """
+    Return the squared distance from every point to every centroid, as a matrix with a row for each point,
+    using |x - c|^2 = |x|^2 - 2 x.c + |c|^2 so the whole matrix comes from one matrix product
+    Parameters:
+    data: the points, one per row
+    centroids: the centroids, one per row
+    norms: the squared length of each point
+    """
+    distances = norms[:, None] - 2*(data @ centroids.T) + (centroids*centroids).sum(axis=1)
+    # rounding can leave points on top of a centroid a little below 0
+    return np.maximum(distances, 0, out=distances)
+
+def assign_all(data, centroids, norms):
     """
-    Return the average of a set of vectors
-    Paramaters:
-    a: list of n-dimensional vectors
+    Return the index of the closest centroid to every point, working out the distances CHUNK_SIZE points at a time
+    Parameters:
+    data: the points, one per row
+    centroids: the centroids, one per row
+    norms: the squared length of each point
     """
-    count = len(a)
-    n = len(a[0])
-    
-    sum_ = [0 for i in range(n)]
+    labels = np.empty(len(data), dtype=np.intp)
+    for start in range(0, len(data), CHUNK_SIZE):
+        chunk = slice(start, start+CHUNK_SIZE)
+        labels[chunk] = np.argmin(squared_distances(data[chunk], centroids, norms[chunk]), axis=1)
+    return labels
+
+def nearest_distances(data, centroids, norms):
+    """
+    Return the squared distance from every point to its closest centroid, working them out CHUNK_SIZE points at a time
+    Parameters:
+    data: the points, one per row
+    centroids: the centroids, one per row
+    norms: the squared length of each point
+    """
+    distances = np.empty(len(data), dtype=np.float64)
+    for start in range(0, len(data), CHUNK_SIZE):
+        chunk = slice(start, start+CHUNK_SIZE)
+        distances[chunk] = squared_distances(data[chunk], centroids, norms[chunk]).min(axis=1)
+    return distances
+
+def sample_weighted(weights, rng):
+    """
+    Return the index of a point picked with probability proportional to its weight, or uniformly if the weights are all 0
+    """
+    total = weights.sum()
+    if total <= 0:
+        return rng.integers(len(weights))
+    return min(np.searchsorted(np.cumsum(weights), rng.random()*total, side="right"), len(weights)-1)
+
+def k_means_plus_plus(data, k, norms, rng, weights=None):
+    """
+    Return k initial centroids picked by k-means++: the first is a random point, and each one after is a point
+    picked with probability proportional to its squared distance from the closest centroid picked so far, so
+    the centroids start spread out over the data
+    Parameters:
+    data: the points, one per row
+    k: the number of centroids
+    norms: the squared length of each point
+    rng: the numpy random number generator to use
+    weights: how many points each point stands for, or None for one each
+    """
+    if weights is None:
+        weights = np.ones(len(data))
+    centroids = [data[sample_weighted(weights, rng)]]
+    distances = nearest_distances(data, np.array(centroids), norms)
+    for i in range(1, k):
+        centroid = data[sample_weighted(weights*distances, rng)]
+        centroids.append(centroid)
+        distances = np.minimum(distances, nearest_distances(data, centroid[None, :], norms))
+    return np.array(centroids)
+
+def k_means_parallel(data, k, norms, rng):
+    """
+    Return k initial centroids picked by k-means||, which needs only a few passes over the data rather than one per
+    centroid like k-means++. In each of PARALLEL_ROUNDS rounds, every point is picked independently with probability
+    proportional to its squared distance from the closest point picked so far, about OVERSAMPLING*k points a round.
+    The picked points are weighted by how many points are closest to them, and k-means++ picks k centroids from them
+    Parameters:
+    data: the points, one per row
+    k: the number of centroids
+    norms: the squared length of each point
+    rng: the numpy random number generator to use
+    """
+    candidates = data[[rng.integers(len(data))]]
+    distances = nearest_distances(data, candidates, norms)
+    for i in range(PARALLEL_ROUNDS):
+        total = distances.sum()
+        if total <= 0:
+            break
+        picked = rng.random(len(data)) < OVERSAMPLING*k*distances/total
+        if picked.any():
+            candidates = np.concatenate([candidates, data[picked]])
+            distances = np.minimum(distances, nearest_distances(data, data[picked], norms))
     
-    for x in a:
-        for i in range(n):
-            sum_[i] += x[i]
+    if len(candidates) <= k:
+        return np.concatenate([candidates, data[rng.choice(len(data), k-len(candidates))]])
+    weights = np.bincount(assign_all(data, candidates, norms), minlength=len(candidates)).astype(np.float64)
+    return k_means_plus_plus(candidates, k, (candidates*candidates).sum(axis=1), rng, weights)
+
+class BoundedAssignment:
+    """
+    Assigns points to their closest centroid like assign_all, but skips the distances that cannot change a point's
+    cluster, using the triangle inequality. Each point keeps an upper bound on the distance to its centroid and a lower
+    bound on the distance to the others, which grow and shrink by how far the centroids move. A point whose upper
+    bound is below its lower bound, or below half the distance from its centroid to the closest other centroid, keeps
+    its cluster without any distances being worked out. "hamerly" keeps one lower bound per point, for the closest
+    other centroid, and "elkan" keeps one for every centroid, which skips more but uses k times as much memory.
+    The distances of a point that might change cluster are all worked out as assign_all does, and a small margin
+    covers rounding, so the labels are the same as assign_all's
+    Parameters:
+    data: the points, one per row
+    norms: the squared length of each point
+    method: "hamerly" or "elkan"
+    """
     
-    for i in range(n):
-        sum_[i] /= count
-    return sum_
+    def __init__(self, data, norms, method="hamerly"):
+        self.data = data
+        self.norms = norms
+        self.method = method
+        self.lengths = np.sqrt(norms.astype(np.float64))
+        # a bound on the rounding in a squared distance, per unit of the squared lengths of the point and centroid
+        self.error_scale = 2*(data.shape[1] + 16)*np.finfo(data.dtype).eps
+        
+        self.centroids = None
+        self.labels = None
+        self.upper = None
+        self.lower = None
+        # the distances worked out, and the distances assign_all would have worked out
+        self.computed = 0
+        self.possible = 0
+        
+    def skipped(self):
+        """
+        Return the fraction of the distances assign_all would have worked out that were skipped
+        """
+        return 1 - self.computed/self.possible if self.possible > 0 else 0
+        
+    def compute(self, rows, centroids):
+        """
+        Work out every distance from some points to the centroids, as assign_all does, and reset their bounds
+        Parameters:
+        rows: the indices of the points
+        centroids: the centroids, one per row
+        """
+        for start in range(0, len(rows), CHUNK_SIZE):
+            chunk = rows[start:start+CHUNK_SIZE]
+            distances = squared_distances(self.data[chunk], centroids, self.norms[chunk]).astype(np.float64)
+            labels = np.argmin(distances, axis=1)
+            self.labels[chunk] = labels
+            self.upper[chunk] = np.sqrt(distances[np.arange(len(chunk)), labels])
+            if self.method == "elkan":
+                self.lower[chunk] = np.sqrt(distances)
+            else:
+                distances[np.arange(len(chunk)), labels] = inf
+                self.lower[chunk] = np.sqrt(distances.min(axis=1))
+            self.computed += distances.size
+            
+    def assign(self, centroids):
+        """
+        Return the index of the closest centroid to every point
+        Parameters:
+        centroids: the centroids, one per row
+        """
+        k = len(centroids)
+        self.possible += len(self.data)*k
+        
+        # the first time, every distance is worked out
+        if self.labels is None:
+            self.labels = np.empty(len(self.data), dtype=np.intp)
+            self.upper = np.empty(len(self.data))
+            self.lower = np.empty((len(self.data), k) if self.method == "elkan" else len(self.data))
+            self.compute(np.arange(len(self.data)), centroids)
+            self.centroids = centroids.copy()
+            return self.labels.copy()
+        
+        # move the bounds by how far the centroids have moved
+        new_centroids = centroids.astype(np.float64)
+        shift = np.sqrt(((new_centroids - self.centroids)**2).sum(axis=1))
+        self.upper += shift[self.labels]
+        if self.method == "elkan":
+            self.lower -= shift
+        else:
+            # the other centroids can have moved by at most the largest shift, or the second largest for the one that moved most
+            order = np.argsort(shift)
+            largest = shift[order[-1]]
+            second = shift[order[-2]] if k > 1 else 0
+            self.lower -= np.where(self.labels == order[-1], second, largest)
+        
+        # half the distance between each pair of centroids: a point closer than this to its centroid stays with it
+        centroid_norms = (new_centroids*new_centroids).sum(axis=1)
+        half = np.sqrt(np.maximum(centroid_norms[:, None] - 2*(new_centroids @ new_centroids.T) + centroid_norms, 0))/2
+        np.fill_diagonal(half, inf)
+        self.computed += k*(k-1)//2
+        
+        # the distance below which no other centroid can be
+        if self.method == "elkan":
+            bound = np.maximum(self.lower, half[self.labels])
+            bound[np.arange(len(self.data)), self.labels] = inf
+            bound = bound.min(axis=1)
+        else:
+            bound = np.maximum(self.lower, half.min(axis=1)[self.labels])
+        bound = np.maximum(bound, 0)
+        margin = 2*self.error_scale*(self.lengths + np.sqrt(centroid_norms.max()))**2
+        unsure = np.flatnonzero(self.upper**2 + margin >= bound**2)
+        
+        # find the real distance to their centroid of the points that might have changed cluster, and only work out
+        # every distance of the ones that still might have
+        for start in range(0, len(unsure), CHUNK_SIZE):
+            chunk = unsure[start:start+CHUNK_SIZE]
+            difference = self.data[chunk] - centroids[self.labels[chunk]]
+            self.upper[chunk] = np.sqrt(np.einsum("ij,ij->i", difference, difference))
+        self.computed += len(unsure)
+        unsure = unsure[self.upper[unsure]**2 + margin[unsure] >= bound[unsure]**2]
+        self.compute(unsure, centroids)
+        
+        self.centroids = new_centroids
+        return self.labels.copy()
 
-def k_means(data, k, n):
+def cluster_sums(data, labels, k):
     """
-    The k-means clustering algorithm
+    Return the sum and the number of the points in each cluster. The points are summed CHUNK_SIZE at a time, by
+    a bincount of each value weighted into the bin of its cluster and column, or for at most GROUPED_SUM_CLUSTERS
+    clusters by multiplying them by a matrix with a 1 in the row of each point's cluster. Both are much faster
+    than np.add.at
     Parameters:
-    data: the data to be analysed
+    data: the points, one per row
+    labels: the index of the cluster each point is in
     k: the number of clusters
-    n: the number of iterations
     """
-    # initialise a result dictionary
-    result = {}
+    counts = np.bincount(labels, minlength=k)
+    # the sums are kept in double precision, so float32 data does not lose accuracy over many points
+    sums = np.zeros((k, data.shape[1]), dtype=np.float64)
+    columns = data.shape[1]
+    for start in range(0, len(data), CHUNK_SIZE):
+        chunk = slice(start, start+CHUNK_SIZE)
+        if k > GROUPED_SUM_CLUSTERS:
+            bins = labels[chunk, None]*columns + np.arange(columns)
+            sums += np.bincount(bins.ravel(), weights=data[chunk].ravel(), minlength=k*columns).reshape(k, columns)
+        else:
+            members = np.zeros((k, len(data[chunk])), dtype=data.dtype)
+            members[labels[chunk], np.arange(len(data[chunk]))] = 1
+            sums += members @ data[chunk]
+    return sums, counts
+
+def update_centroids(data, labels, centroids):
+    """
+    Return the mean of the points assigned to each centroid. A centroid with no points stays where it is
+    Parameters:
+    data: the points, one per row
+    labels: the index of the centroid each point is assigned to
+    centroids: the current centroids, one per row
+    """
+    sums, counts = cluster_sums(data, labels, len(centroids))
+
+    new_centroids = centroids.copy()
+    filled = counts > 0
+    new_centroids[filled] = sums[filled] / counts[filled, None]
+    return new_centroids
+
+def k_means(data, k, n, dtype=np.float64, tolerance=TOLERANCE, seed=None, method="plain"):
+    """
+    The k-means clustering algorithm. Every point is assigned to its closest centroid in one step, and the
+    centroids are moved to the mean of their points with a grouped sum, so there is no Python loop over the points.
+    It stops early once no point changes cluster, or no centroid moves further than the tolerance.
+    Returns a dictionary of [centroid, indices of the points assigned to it] for each cluster, the number of
+    iterations run, and the fraction of distances that were skipped (see BoundedAssignment)
+    Parameters:
+    data: the data to be analysed, one point per row
+    k: the number of clusters
+    n: the most iterations to run
+    dtype: np.float64, or np.float32 to use half the memory on large data sets
+    tolerance: the distance the centroids must all move less than to stop early
+    seed: the seed for picking the initial centroids, so runs can be repeated, or None for a random one
+    method: "plain" to work out every distance each iteration, or "hamerly" or "elkan" to skip the ones that cannot
+    change a point's cluster, which gives the same clusters
+    """
+    data = np.asarray(data, dtype=dtype)
+    norms = (data*data).sum(axis=1)
+    rng = np.random.default_rng(seed)
     
     # initialise k centroids
-    for i in range(k):
-        if centroid_type == "random":
-            result[i] = [[randint(0,16) for j in range(64)], []]
+    if centroid_type == "random":
+        centroids = rng.integers(0, 17, (k, data.shape[1])).astype(dtype)
+    elif centroid_type == "k-means++":
+        centroids = k_means_plus_plus(data, k, norms, rng)
+    elif centroid_type == "k-means||":
+        centroids = k_means_parallel(data, k, norms, rng)
+    else:
+        centroids = data[:k].copy()
+    
+    # the cluster of each point, which is worked out again each iteration.
+    # no point is assigned to a cluster until the first iteration
+    assignment = np.full(len(data), -1)
+    bounded = BoundedAssignment(data, norms, method) if method != "plain" else None
+    iterations = 0
+    while iterations < n:
+        iterations += 1
+        # assign the data points to the closest cluster, and stop if none of them moved
+        if bounded is None:
+            new_assignment = assign_all(data, centroids, norms)
         else:
-            result[i] = [data[i], []]
-    for i in range(n):
-        # assign the data points to the closest cluster
-        for x in data:
-            distances = [distance(result[a][0], x) for  a in range(k)]
-            minimum_index = distances.index(min(distances))
-            result[minimum_index][1].append(x)
-        # set the centroids to be the mean of the vectors assigned to it
-        for cluster in result.keys():
-            if len(result[cluster][1]) == 0:
-                centroid = [randint(0,16) for i in range(64)]
-                continue
-            centroid = average(result[cluster][1])
-            result[cluster][0] = centroid
-    return result
+            new_assignment = bounded.assign(centroids)
+        if np.array_equal(new_assignment, assignment):
+            break
+        assignment = new_assignment
+        
+        # set the centroids to be the mean of the vectors assigned to it, and stop if they have settled
+        new_centroids = update_centroids(data, assignment, centroids)
+        shift = np.sqrt(((new_centroids - centroids)**2).sum(axis=1)).max()
+        centroids = new_centroids
+        if shift <= tolerance:
+            break
+    
+    result = {}
+    for cluster in range(k):
+        result[cluster] = [centroids[cluster], np.flatnonzero(assignment == cluster)]
+    return result, iterations, 0 if bounded is None else bounded.skipped()
+
+def inertia(data, centroids):
+    """
+    Return the sum of the squared distances from each point to its closest centroid, which k-means makes as
+    small as it can, so lower is better
+    """
+    data = np.asarray(data, dtype=centroids.dtype)
+    return nearest_distances(data, centroids, (data*data).sum(axis=1)).sum()
+
+def batches(source, batch_size, rng=None):
+    """
+    Yield the rows of the data batch_size at a time. A .npy file is memory mapped, so only the batch being used is
+    read into memory, and data sets larger than the memory can be clustered. The rows of each batch are next to each
+    other in the data, so the rows should be in a random order, but the order of the batches is shuffled if rng is given
+    Parameters:
+    source: an array of points, one per row, or the path of a .npy file of one
+    batch_size: the number of rows in each batch
+    rng: the numpy random number generator to shuffle the batches with, or None to keep them in order
+    """
+    data = np.load(source, mmap_mode="r") if isinstance(source, str) else source
+    starts = np.arange(0, len(data), batch_size)
+    if rng is not None:
+        rng.shuffle(starts)
+    for start in starts:
+        yield np.asarray(data[start:start+batch_size])
+
+class MiniBatchKMeans:
+    """
+    Mini-batch k-means, which moves the centroids after each small batch of points rather than after a pass over the
+    whole data set, so it needs only the current batch in memory and far fewer passes over the data. Each centroid
+    moves towards the mean of its points in the batch with a learning rate of one over the number of points it has
+    been given so far, so it settles down as it sees more of the data. The first batch picks the initial centroids
+    with k-means++, and must have at least k points
+    Parameters:
+    k: the number of clusters
+    dtype: np.float64, or np.float32 to use half the memory on large data sets
+    seed: the seed for picking the initial centroids and shuffling the batches, or None for a random one
+    """
+    
+    def __init__(self, k, dtype=np.float64, seed=None):
+        self.k = k
+        self.dtype = dtype
+        self.rng = np.random.default_rng(seed)
+        self.centroids = None
+        # the number of points each centroid has been given
+        self.counts = np.zeros(k, dtype=np.float64)
+        
+    def partial_fit(self, batch):
+        """
+        Move the centroids towards the points of one batch, one point per row
+        """
+        batch = np.asarray(batch, dtype=self.dtype)
+        norms = (batch*batch).sum(axis=1)
+        if self.centroids is None:
+            if len(batch) < self.k:
+                raise ValueError("the first batch must have at least k points")
+            self.centroids = k_means_plus_plus(batch, self.k, norms, self.rng).astype(self.dtype)
+        
+        sums, counts = cluster_sums(batch, assign_all(batch, self.centroids, norms), self.k)
+        self.counts += counts
+        filled = counts > 0
+        step = (sums[filled] - counts[filled, None]*self.centroids[filled]) / self.counts[filled, None]
+        self.centroids[filled] += step.astype(self.dtype)
+        return self
+    
+    def fit(self, source, batch_size=1024, passes=1):
+        """
+        Run partial_fit on every batch of the data, in a random order, 'passes' times
+        Parameters:
+        source: an array of points, one per row, or the path of a .npy file of one
+        batch_size: the number of points in each batch
+        passes: the number of times to go through the data
+        """
+        for i in range(passes):
+            for batch in batches(source, batch_size, self.rng):
+                self.partial_fit(batch)
+        return self
+    
+    def predict(self, data):
+        """
+        Return the index of the closest centroid to each point
+        """
+        data = np.asarray(data, dtype=self.dtype)
+        return assign_all(data, self.centroids, (data*data).sum(axis=1))
 
 def display_digit(digit):
     """
@@ -98,7 +466,8 @@ def accuracy(frac):
     digit_clusters = {}
     
     for i in range(10):
-        result_labels = [labels[digits.data.tolist().index(list(result[i][1][n]))] for n in range(len(result[i][1]))]
+        # the training data is the start of the digits, so the indices of a cluster's points are those of their labels
+        result_labels = labels[result[i][1]].tolist()
         try:
             digit_clusters[max(set(result_labels), key=result_labels.count)] = result[i][0]
         except:
@@ -109,9 +478,9 @@ def accuracy(frac):
     
     correct = 0
     total = 0
-    for digit in digits.data[int(frac*len(digits.data)):]:
-        guess = assign(digit, digit_clusters)
-        if guess == labels[digits.data.tolist().index(list(digit))]:
+    for index in range(int(frac*len(digits.data)), len(digits.data)):
+        guess = assign(digits.data[index], digit_clusters)
+        if guess == labels[index]:
             correct += 1
         total += 1
         
@@ -122,15 +491,17 @@ def accuracy(frac):
 digits = load_digits(return_X_y=False)
 _, labels = load_digits(return_X_y=True)
 
-# set to "random" for initial centroids to be random
-centroid_type = "random"
+# set to "k-means++" or "k-means||" to spread the initial centroids out over the data, "random" for initial
+# centroids to be random, or anything else to start from the first points
+centroid_type = "k-means++"
 
-# set to "centroids" to show the centroids, "clusters" to show clusters, or "accuracy" to show accuracy
+# set to "centroids" to show the centroids, "clusters" to show clusters, "accuracy" to show accuracy, or
+# "mini-batch" to compare mini-batch k-means with k-means
 display = "accuracy"
 
 if display == "clusters":
     # display the clusters
-    result = k_means(digits.data, 10, 30)
+    result, iterations, skipped = k_means(digits.data, 10, 30)
     
     centroids = [result[i][0] for i in range(10)]
     embedding = PCA(n_components=2)
@@ -150,7 +521,8 @@ elif display == "accuracy":
     accuracies = []
 
     for frac in fractions:
-        result = k_means(digits.data[:int(frac*len(digits.data))], 10, 30)
+        result, iterations, skipped = k_means(digits.data[:int(frac*len(digits.data))], 10, 30)
+        print("k-means on", frac, "of the data finished after", iterations, "iterations")
         accuracies.append(accuracy(frac))
 
     plt.plot(fractions, accuracies)
@@ -160,10 +532,17 @@ elif display == "accuracy":
     
 
 elif display == "centroids":
-    result = k_means(digits.data, 10, 30)
+    result, iterations, skipped = k_means(digits.data, 10, 30)
     
     centroids = [result[i][0] for i in range(10)]
     
     # display each centroid
     for centroid in centroids:
-        display_digit(np.array(centroid))
\ No newline at end of file
+        display_digit(np.array(centroid))
+
+elif display == "mini-batch":
+    # compare how well the clusters fit the digits, after three passes of mini-batch k-means and after k-means
+    result, iterations, skipped = k_means(digits.data, 10, 30, seed=0)
+    print("k-means:", iterations, "passes, inertia", inertia(digits.data, np.array([result[i][0] for i in range(10)])))
+    mini_batch = MiniBatchKMeans(10, seed=0).fit(digits.data, batch_size=256, passes=3)
+    print("mini-batch k-means: 3 passes, inertia", inertia(digits.data, mini_batch.centroids))
\ No newline at end of file
@@ -0,0 +1,286 @@
+import json
+import os
+import sys
+from mmap import mmap, ACCESS_READ
+
+from puzzle_board import Heuristic, board_shape, directions, neighbour_table
+
+# where the tables are kept between runs
+PDB_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdb")
+
+# boards with at most this many cells get one exact table, larger boards get additive tables
+EXACT_CELLS = 9
+
+# the value stored for configurations that can not be reached from the goal
+UNREACHED = 255
+
+# when a table also records moves, each entry holds the distance in its low bits, and the direction of the
+# best move above them
+DISTANCE_BITS = 5
+DISTANCE_MASK = (1 << DISTANCE_BITS)-1
+
+
+def rank(positions, cells):
+    """
+    number a sequence of distinct cells from 0 up to cells!/(cells-k)! - 1, where k is the length
+    of the sequence. this is the index of the sequence in the tables, so no space is wasted
+
+    parameters:
+    - positions: the cells each tile of a pattern is in
+    - cells: the number of cells on the board
+    """
+
+    index = 0
+    used = 0
+    for i in range(len(positions)):
+        position = positions[i]
+        # count the cells before this one that are not already taken, as the choices for this tile
+        index = index*(cells-i) + position - (used & ((1 << position)-1)).bit_count()
+        used |= 1 << position
+    return index
+
+
+def table_size(cells, k):
+    size = 1
+    for i in range(k):
+        size *= cells-i
+    return size
+
+
+def build_exact(goal, columns=None, record_moves=False):
+    """
+    find the distance from the goal of every configuration that can reach it, by a breadth first search
+    backwards from the goal. the table is indexed by the positions of every tile but the last two, as
+    the parity decides where those go, so an 8-puzzle table has 9!/2 entries
+
+    parameters:
+    - goal: a tuple containing the goal configuration
+    - columns: the width of the board. if None, the board is taken to be square
+    - record_moves: whether to also store the direction to move the blank in to get one step closer, above
+      the distance's DISTANCE_BITS, as the distance oracle does. a configuration is first reached from a
+      neighbour one step closer to the goal, so the best move goes back to it
+    """
+
+    cells = len(goal)
+    rows, columns = board_shape(cells, columns)
+    swaps = neighbour_table(rows, columns)
+    moves = directions(columns)
+    tiles = list(range(cells-2))
+    largest = DISTANCE_MASK if record_moves else UNREACHED-1
+
+    table = bytearray([UNREACHED])*table_size(cells, len(tiles))
+    table[rank([goal.index(tile) for tile in tiles], cells)] = 0
+
+    layer = [list(goal)]
+    distance = 0
+    while len(layer) > 0:
+        distance += 1
+        next_layer = []
+        for config in layer:
+            blank_index = config.index(0)
+            for swap in swaps[blank_index]:
+                new_config = config[:]
+                new_config[blank_index] = new_config[swap]
+                new_config[swap] = 0
+                index = rank([new_config.index(tile) for tile in tiles], cells)
+                if table[index] == UNREACHED:
+                    if distance > largest:
+                        raise ValueError("the table only stores distances of up to " + str(largest) + " moves")
+                    table[index] = distance
+                    if record_moves:
+                        # from the new configuration, the blank moves back from 'swap' to 'blank_index'
+                        table[index] |= moves.index(blank_index-swap) << DISTANCE_BITS
+                    next_layer.append(new_config)
+        layer = next_layer
+
+    return tiles, table
+
+
+def build_additive(goal, pattern, columns=None):
+    """
+    find, for every placement of the tiles in a pattern, the fewest moves of those tiles needed
+    to put them in their goal positions. the other tiles are treated as blank, and moving them is
+    free, so the tables of disjoint patterns can be added together and still never overestimate
+
+    the search is a breadth first search backwards from the goal over the positions of the pattern
+    tiles and the blank, where free moves are searched before the next layer is started
+
+    parameters:
+    - goal: a tuple containing the goal configuration
+    - pattern: the tiles in the pattern, not including the blank
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+
+    cells = len(goal)
+    swaps = neighbour_table(*board_shape(cells, columns))
+    k = len(pattern)
+
+    # a state packs the blank position and then each pattern tile's position into an int, with
+    # 'bits' bits for each, so the seen states can be kept in a bytearray indexed by the state
+    bits = (cells-1).bit_length()
+    mask = (1 << bits)-1
+    seen = bytearray(1 << (bits*(k+1)))
+
+    table = bytearray([UNREACHED])*table_size(cells, k)
+
+    start = goal.index(0)
+    for i in range(k):
+        start |= goal.index(pattern[i]) << (bits*(i+1))
+
+    layer = [start]
+    distance = 0
+    while len(layer) > 0:
+        next_layer = []
+        stack = layer
+        while len(stack) > 0:
+            state = stack.pop()
+            if seen[state]:
+                continue
+            seen[state] = 1
+
+            # the first time the pattern tiles are seen in these positions is the fewest moves
+            positions = [(state >> (bits*(i+1))) & mask for i in range(k)]
+            index = rank(positions, cells)
+            if table[index] == UNREACHED:
+                table[index] = distance
+
+            blank_index = state & mask
+            for swap in swaps[blank_index]:
+                if swap in positions:
+                    # moving a pattern tile costs one move
+                    shift = bits*(positions.index(swap)+1)
+                    new_state = state - blank_index + swap + ((blank_index - swap) << shift)
+                    if not seen[new_state]:
+                        next_layer.append(new_state)
+                else:
+                    new_state = state - blank_index + swap
+                    if not seen[new_state]:
+                        stack.append(new_state)
+
+        layer = next_layer
+        distance += 1
+
+    return list(pattern), table
+
+
+def default_patterns(goal):
+    """
+    split the tiles of a board into disjoint patterns for additive tables: the tiles in the order of
+    their goal positions, in groups small enough for the search to keep track of every state
+
+    parameters:
+    - goal: a tuple containing the goal configuration
+    """
+
+    bits = (len(goal)-1).bit_length()
+    size = 26//bits - 1
+    tiles = [tile for tile in goal if tile != 0]
+    return [tiles[i:i+size] for i in range(0, len(tiles), size)]
+
+
+def database_path(goal, tiles, columns, directory=PDB_DIRECTORY):
+    name = "-".join(str(tile) for tile in goal) + "_" + str(columns) + "_" + "-".join(str(tile) for tile in tiles)
+    return os.path.join(directory, name + ".pdb")
+
+
+def save_database(path, goal, columns, tiles, table):
+    """
+    write a table to a file, after a one line header describing it. the file is written under another
+    name and then renamed, so other processes never see half a table
+    """
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    header = json.dumps({"goal": list(goal), "columns": columns, "tiles": list(tiles)}).encode() + b"\n"
+    temporary = path + "." + str(os.getpid())
+    with open(temporary, "wb") as file:
+        file.write(header)
+        file.write(table)
+    os.replace(temporary, path)
+
+
+class PatternDatabase:
+    """
+    a table loaded from a file by memory mapping it read-only, so the operating system reads it in as
+    it is used, and every process using the same file shares one copy of it
+
+    parameters:
+    - path: the file the table was saved to
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self.map = mmap(file.fileno(), 0, access=ACCESS_READ)
+        header_end = self.map.find(b"\n")+1
+        header = json.loads(self.map[:header_end])
+        self.cells = len(header["goal"])
+        self.tiles = header["tiles"]
+        self.table = memoryview(self.map)[header_end:]
+
+    def lookup(self, config):
+        """
+        find the table's value for a configuration, given as a sequence of tiles
+        """
+        return self.table[rank([config.index(tile) for tile in self.tiles], self.cells)]
+
+
+class PatternDatabases(Heuristic):
+    """
+    the heuristic taken from the tables for a goal, building and saving any that are missing. boards of
+    up to 9 cells use one exact table, and larger boards use the sum of additive tables over disjoint patterns
+
+    parameters:
+    - goal: a tuple containing the goal configuration
+    - columns: the width of the board. if None, the board is taken to be square
+    - directory: where the tables are saved
+    """
+
+    def __init__(self, goal, columns=None, directory=PDB_DIRECTORY):
+        columns = board_shape(len(goal), columns)[1]
+        self.databases = []
+
+        if len(goal) <= EXACT_CELLS:
+            path = database_path(goal, range(len(goal)-2), columns, directory)
+            if not os.path.exists(path):
+                tiles, table = build_exact(goal, columns)
+                save_database(path, goal, columns, tiles, table)
+            self.databases.append(PatternDatabase(path))
+        else:
+            for pattern in default_patterns(goal):
+                path = database_path(goal, pattern, columns, directory)
+                if not os.path.exists(path):
+                    tiles, table = build_additive(goal, pattern, columns)
+                    save_database(path, goal, columns, tiles, table)
+                self.databases.append(PatternDatabase(path))
+
+    def evaluate(self, config):
+        total = 0
+        for database in self.databases:
+            total += database.lookup(config)
+        return total
+
+    def update(self, h, config, blank_index, swap, tile):
+        # only the tables with the moved tile or the blank in their pattern change
+        for database in self.databases:
+            if tile in database.tiles or 0 in database.tiles:
+                positions = [config.index(pattern_tile) for pattern_tile in database.tiles]
+                old = database.table[rank(positions, database.cells)]
+                for i in range(len(positions)):
+                    if positions[i] == swap:
+                        positions[i] = blank_index
+                    elif positions[i] == blank_index:
+                        positions[i] = swap
+                h += database.table[rank(positions, database.cells)] - old
+        return h
+
+
+if __name__ == "__main__":
+    # build the tables for the goals given as comma separated tiles, or for the standard 8-puzzle goals
+    if len(sys.argv) > 1:
+        goals = [tuple(int(tile) for tile in goal.split(",")) for goal in sys.argv[1:]]
+    else:
+        goals = [(0, 1, 2, 3, 4, 5, 6, 7, 8), (1, 2, 3, 8, 0, 4, 7, 6, 5)]
+
+    for goal in goals:
+        databases = PatternDatabases(goal)
+        print("Tables for", goal, "are in", ", ".join(database.path for database in databases.databases))
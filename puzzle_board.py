@@ -0,0 +1,273 @@
+from math import isqrt
+
+
+def board_shape(cells, columns=None):
+    """
+    find the number of rows and columns of a board, or None if the cells cannot make one
+
+    parameters:
+    - cells: the number of cells on the board, including the blank
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+
+    if columns is None:
+        columns = isqrt(cells)
+        if columns*columns != cells:
+            return None
+    if columns < 2 or cells % columns != 0 or cells // columns < 2:
+        return None
+    return cells // columns, columns
+
+
+def neighbour_table(rows, columns):
+    """
+    build a dictionary of the possible moves that can be made depending on where the blank space is,
+    that is, the cells next to each cell in a board with the given number of rows and columns
+    """
+
+    swaps = {}
+    for cell in range(rows*columns):
+        row, column = divmod(cell, columns)
+        swaps[cell] = []
+        if row > 0:
+            swaps[cell].append(cell-columns)
+        if column > 0:
+            swaps[cell].append(cell-1)
+        if column < columns-1:
+            swaps[cell].append(cell+1)
+        if row < rows-1:
+            swaps[cell].append(cell+columns)
+    return swaps
+
+
+def directions(columns):
+    """
+    the change in the blank's position for a move up, left, right and down, in the order of the
+    neighbour table. a move is stored as its index in this list, which fits in 2 bits, and the
+    opposite of move d is move 3-d
+    """
+    return [-columns, -1, 1, columns]
+
+
+def count_inversions(start_tuple):
+    """
+    Count the number of pairs of tiles that are out of order, ignoring the blank tile
+    """
+
+    tiles = [tile for tile in start_tuple if tile != 0]
+    swap_count = 0
+    for i in range(len(tiles)):
+        for j in range(i+1,len(tiles)):
+            if tiles[i] > tiles[j]:
+                swap_count += 1
+
+    return swap_count
+
+
+def parity(config, columns):
+    """
+    Find the parity of a configuration, which no move can change. A horizontal move changes no inversions,
+    and a vertical move changes them by one less than the width, so on boards of an even width the row of
+    the blank tile is also counted
+    """
+
+    if columns % 2 == 0:
+        return (count_inversions(config) + config.index(0)//columns) % 2
+    return count_inversions(config) % 2
+
+
+class Heuristic:
+    """
+    the interface for distance heuristics. Astar accepts one of these in place of a heuristic_type string,
+    see heuristics.py for the ones that come with it. configurations are given to them as sequences of
+    tiles, read row by row with 0 as the blank tile
+    """
+
+    # whether update needs to be given the configuration, or only the moved tile
+    needs_config = True
+
+    def evaluate(self, config):
+        """
+        return the heuristic of a configuration
+        """
+        raise NotImplementedError
+
+    def update(self, h, config, blank_index, swap, tile):
+        """
+        return the heuristic of the configuration made by moving 'tile' from position 'swap' into the blank
+        space at 'blank_index', given the configuration before the move and its heuristic 'h'. unless this
+        is overridden, the new configuration is evaluated from scratch
+        """
+        new_config = list(config)
+        new_config[blank_index] = tile
+        new_config[swap] = 0
+        return self.evaluate(new_config)
+
+
+class Board:
+    """
+    the tables shared by every board representation. configurations are read row by row,
+    with 0 as the blank tile
+
+    parameters:
+    - heuristic: the Heuristic to use
+    - goal: a tuple containing the goal configuration
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+
+    def __init__(self, heuristic, goal, columns=None):
+        self.cells = len(goal)
+        self.rows, self.columns = board_shape(self.cells, columns)
+        self.swaps = neighbour_table(self.rows, self.columns)
+        self.heuristic = heuristic
+
+        # move_codes[blank_index][swap] is the direction of the blank when it moves from blank_index to swap
+        self.directions = directions(self.columns)
+        self.move_codes = {}
+        for blank_index in self.swaps:
+            self.move_codes[blank_index] = {swap: self.directions.index(swap-blank_index) for swap in self.swaps[blank_index]}
+
+    def undo(self, state, move):
+        """
+        return the configuration a state was reached from by the move with the given code
+        """
+        blank_index = self.blank(state)
+        return self.move(state, blank_index, blank_index - self.directions[move])
+
+    def replay(self, config, moves):
+        """
+        generate the configurations visited by making moves from a configuration, starting with
+        the configuration itself. each configuration is made as it is asked for
+
+        parameters:
+        - config: a configuration, as a tuple
+        - moves: the codes of the moves to make
+        """
+        config = list(config)
+        yield tuple(config)
+        blank_index = config.index(0)
+        for move in moves:
+            swap = blank_index + self.directions[move]
+            config[blank_index] = config[swap]
+            config[swap] = 0
+            blank_index = swap
+            yield tuple(config)
+
+
+class TupleBoard(Board):
+    """
+    configurations stored as tuples
+    """
+
+    def encode(self, config):
+        return config
+
+    def decode(self, state):
+        return state
+
+    def blank(self, state):
+        return state.index(0)
+
+    def move(self, state, blank_index, swap):
+        """
+        return the configuration made by moving the tile in position 'swap' into the blank space
+        """
+        new_config = list(state)
+        new_config[blank_index] = new_config[swap]
+        new_config[swap] = 0
+        return tuple(new_config)
+
+    def step(self, state, blank_index, swap, h):
+        """
+        move the tile in position 'swap' into the blank space, and return the new configuration
+        and its heuristic, given the heuristic 'h' of the old one
+        """
+        new_config = list(state)
+        tile = new_config[swap]
+        new_config[blank_index] = tile
+        new_config[swap] = 0
+        return tuple(new_config), self.heuristic.update(h, state, blank_index, swap, tile)
+
+    def child_heuristic(self, state, blank_index, swap, h):
+        """
+        return the heuristic of the configuration made by moving the tile in position 'swap' into
+        the blank space, given the heuristic 'h' of the old one, without making the move
+        """
+        return self.heuristic.update(h, state, blank_index, swap, state[swap])
+
+    def evaluate(self, state):
+        return self.heuristic.evaluate(state)
+
+
+class PackedBoard(Board):
+    """
+    configurations packed into a single int, with a fixed number of bits per tile (4 up to the 15-puzzle,
+    cell 0 in the lowest bits) and the index of the blank tile cached above them. a packed 8-puzzle board
+    is a quarter of the size of a 9-tuple, and a move only needs a few bit operations
+    """
+
+    def __init__(self, heuristic, goal, columns=None):
+        Board.__init__(self, heuristic, goal, columns)
+        self.tile_bits = max(4, (self.cells-1).bit_length())
+        self.tile_mask = (1 << self.tile_bits) - 1
+        self.blank_shift = self.cells*self.tile_bits
+
+        # moves[blank_index][swap] is what moving a tile from 'swap' into the blank space adds to a
+        # packed board, per unit of the tile's number, and the change to the cached blank index
+        self.moves = {}
+        for blank_index in self.swaps:
+            self.moves[blank_index] = {}
+            for swap in self.swaps[blank_index]:
+                self.moves[blank_index][swap] = ((1 << (self.tile_bits*blank_index)) - (1 << (self.tile_bits*swap)),
+                                                 (swap-blank_index) << self.blank_shift)
+
+    def encode(self, config):
+        state = config.index(0) << self.blank_shift
+        for i in range(self.cells):
+            state |= config[i] << (self.tile_bits*i)
+        return state
+
+    def decode(self, state):
+        return tuple((state >> (self.tile_bits*i)) & self.tile_mask for i in range(self.cells))
+
+    def blank(self, state):
+        return state >> self.blank_shift
+
+    def move(self, state, blank_index, swap):
+        """
+        return the configuration made by moving the tile in position 'swap' into the blank space
+        """
+        # the blank cell holds 0, so the tile can be moved by adding a precomputed difference
+        tile_shift, blank_shift = self.moves[blank_index][swap]
+        tile = (state >> (self.tile_bits*swap)) & self.tile_mask
+        return state + tile*tile_shift + blank_shift
+
+    def step(self, state, blank_index, swap, h):
+        """
+        move the tile in position 'swap' into the blank space, and return the new configuration
+        and its heuristic, given the heuristic 'h' of the old one
+        """
+        tile_shift, blank_shift = self.moves[blank_index][swap]
+        tile = (state >> (self.tile_bits*swap)) & self.tile_mask
+
+        # only unpack the board if the heuristic needs more than the moved tile
+        config = self.decode(state) if self.heuristic.needs_config else None
+        return state + tile*tile_shift + blank_shift, self.heuristic.update(h, config, blank_index, swap, tile)
+
+    def child_heuristic(self, state, blank_index, swap, h):
+        """
+        return the heuristic of the configuration made by moving the tile in position 'swap' into
+        the blank space, given the heuristic 'h' of the old one, without making the move
+        """
+        tile = (state >> (self.tile_bits*swap)) & self.tile_mask
+        config = self.decode(state) if self.heuristic.needs_config else None
+        return self.heuristic.update(h, config, blank_index, swap, tile)
+
+    def evaluate(self, state):
+        return self.heuristic.evaluate(self.decode(state))
+
+
+BOARDS = {
+    "tuple": TupleBoard,
+    "packed": PackedBoard
+}
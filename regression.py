@@ -0,0 +1,133 @@
+import argparse
+import json
+import sys
+from random import Random
+from time import time
+
+from solver import Astar
+from distance_oracle import STANDARD_GOALS, get_oracle
+from instances import SEED, random_walk
+from puzzle_board import neighbour_table
+
+# the (search, heuristic, board) combinations to check, where every one of them must give an optimal solution
+SEARCHES = ["astar", "ida", "bidirectional", "anytime"]
+HEURISTICS = ["manhattan", "euclidean", "linear_conflict", "walking_distance", "pdb"]
+BOARDS = ["tuple", "packed"]
+# the backward side of a bidirectional search with pattern databases builds a table for every start
+SKIP = [("bidirectional", "pdb")]
+# the searches also checked with a weight, whose solutions must be no more than the weight times the shortest
+WEIGHTED_SEARCHES = ["astar", "ida"]
+WEIGHT = 2
+
+INSTANCES = 20
+SCRAMBLE_LENGTH = 200
+
+# a run is reported as slower than the saved one when it expands more nodes, or takes this many times as long
+TIME_TOLERANCE = 1.5
+
+
+def check_solution(solution, start, goal, distance, weight=1):
+    """
+    check a solution is a path of single moves from the start to the goal, and is as short as the
+    oracle's, or no more than 'weight' times as long, returning [bool, reason] like check_valid
+    """
+    swaps = neighbour_table(3, 3)
+    if len(solution) == 0 or solution[0] != start or solution[-1] != goal:
+        return [False, "does not join the start to the goal"]
+    for i in range(1, len(solution)):
+        # a move swaps the blank with a tile next to it, and nothing else
+        changed = [cell for cell in range(len(start)) if solution[i][cell] != solution[i-1][cell]]
+        if len(changed) != 2 or 0 not in (solution[i][changed[0]], solution[i][changed[1]]) or changed[1] not in swaps[changed[0]]:
+            return [False, "step " + str(i) + " is not a single move"]
+    if len(solution)-1 < distance or len(solution)-1 > weight*distance:
+        return [False, str(len(solution)-1) + " moves, but the shortest solution has " + str(distance)]
+    return [True, None]
+
+
+def run():
+    """
+    solve every instance with every combination, and return the results and the number of failures
+    """
+    rng = Random(SEED)
+    results = []
+    failures = 0
+    for goal in STANDARD_GOALS:
+        oracle = get_oracle(goal)
+        for start in [random_walk(goal, SCRAMBLE_LENGTH, rng) for i in range(INSTANCES)]:
+            distance = oracle.distance(start)
+            combinations = [(search, heuristic_type, 1) for search in SEARCHES for heuristic_type in HEURISTICS
+                            if (search, heuristic_type) not in SKIP]
+            combinations += [(search, "manhattan", WEIGHT) for search in WEIGHTED_SEARCHES]
+            for search, heuristic_type, weight in combinations:
+                for board in BOARDS:
+                    astar = Astar(heuristic_type, start, goal, "heap", board, search=search, weight=None if weight == 1 else weight)
+                    start_time = time()
+                    astar.algorithm()
+                    elapsed = time()-start_time
+
+                    correct, reason = check_solution(astar.solution, start, goal, distance, weight)
+                    if not correct:
+                        failures += 1
+                        print("FAIL", search, heuristic_type, board, weight, start, "->", goal, ":", reason)
+                    results.append({"search": search, "heuristic": heuristic_type, "board": board, "weight": weight,
+                                    "start": list(start), "goal": list(goal), "moves": distance,
+                                    "expanded": astar.expanded, "time": elapsed, "correct": correct})
+    return results, failures
+
+
+def key(result):
+    # results saved before weighted searches were checked have no weight
+    search = result["search"] if result.get("weight", 1) == 1 else result["search"] + " w=" + str(result["weight"])
+    return (search, result["heuristic"], result["board"], tuple(result["start"]), tuple(result["goal"]))
+
+
+def compare(results, baseline):
+    """
+    print the instances that expanded more nodes or took noticeably longer than in a saved run
+    """
+    previous = {key(result): result for result in baseline}
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        if result["expanded"] > old["expanded"]:
+            print("MORE NODES", key(result)[:3], result["start"], ":", old["expanded"], "->", result["expanded"])
+        elif result["time"] > TIME_TOLERANCE*old["time"] and result["time"] > 0.01:
+            print("SLOWER", key(result)[:3], result["start"], ":", "%.3f s -> %.3f s" % (old["time"], result["time"]))
+
+
+def summarise(results):
+    """
+    print the total nodes expanded and time for each combination
+    """
+    totals = {}
+    for result in results:
+        total = totals.setdefault(key(result)[:3], [0, 0])
+        total[0] += result["expanded"]
+        total[1] += result["time"]
+    print("search".ljust(15) + "heuristic".ljust(20) + "board".ljust(8) + "expanded".rjust(10) + "time".rjust(12))
+    for combination in totals:
+        expanded, elapsed = totals[combination]
+        print(combination[0].ljust(15) + combination[1].ljust(20) + combination[2].ljust(8)
+              + str(expanded).rjust(10) + ("%.3f s" % elapsed).rjust(12))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check every search finds optimal solutions, and track the nodes expanded and time.")
+    parser.add_argument("--save", help="file to save the results of this run to")
+    parser.add_argument("--compare", help="file of saved results to compare this run against")
+    args = parser.parse_args()
+
+    results, failures = run()
+    summarise(results)
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            compare(results, [json.loads(line) for line in file])
+    if args.save is not None:
+        with open(args.save, "w") as file:
+            for result in results:
+                file.write(json.dumps(result) + "\n")
+
+    print(str(len(results)) + " solves, " + str(failures) + " failures")
+    sys.exit(1 if failures > 0 else 0)
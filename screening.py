@@ -0,0 +1,200 @@
+import argparse
+import sys
+
+import numpy as np
+
+from batch import parse_config
+from puzzle_board import board_shape, parity
+
+# the configurations read and scored at once when screening a file
+CHUNK_SIZE = 100000
+
+
+def shape_of(configs, columns=None):
+    """
+    check an array of configurations, one per row, fits a board, and return it with the board's rows and columns
+
+    parameters:
+    - configs: an (N, cells) array of configurations, or anything numpy can make one from
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+    configs = np.asarray(configs, dtype=np.int64)
+    if configs.ndim != 2:
+        raise ValueError("the configurations should be given one per row")
+    shape = board_shape(configs.shape[1], columns)
+    if shape is None:
+        raise ValueError("the configurations do not fit a board of this width")
+    return configs, shape[0], shape[1]
+
+
+def goal_positions(goal, columns):
+    """
+    the row and column of each tile in the goal, as arrays indexed by tile
+    """
+    goal = np.asarray(goal, dtype=np.int64)
+    goal_row = np.empty(len(goal), dtype=np.int64)
+    goal_column = np.empty(len(goal), dtype=np.int64)
+    goal_row[goal] = np.arange(len(goal)) // columns
+    goal_column[goal] = np.arange(len(goal)) % columns
+    return goal_row, goal_column
+
+
+def valid_configs(configs):
+    """
+    flag the configurations that hold every tile from 0 to cells-1 exactly once
+    """
+    configs = np.asarray(configs, dtype=np.int64)
+    return (np.sort(configs, axis=1) == np.arange(configs.shape[1])).all(axis=1)
+
+
+def inversion_counts(configs):
+    """
+    count the pairs of tiles that are out of order in each configuration, ignoring the blank tile, like
+    puzzle_board.count_inversions. each tile is compared with every tile after it, for all the
+    configurations at once
+    """
+    configs = np.asarray(configs, dtype=np.int64)
+    counts = np.zeros(len(configs), dtype=np.int64)
+    for i in range(configs.shape[1]-1):
+        later = configs[:, i+1:]
+        counts += ((configs[:, i, None] > later) & (later != 0)).sum(axis=1)
+    return counts
+
+
+def parities(configs, columns=None):
+    """
+    find the parity of each configuration, like puzzle_board.parity, which no move can change
+    """
+    configs, rows, columns = shape_of(configs, columns)
+    result = inversion_counts(configs)
+    if columns % 2 == 0:
+        result += np.argmax(configs == 0, axis=1) // columns
+    return result % 2
+
+
+def solvable(configs, goal, columns=None):
+    """
+    flag the configurations that are valid and can reach the goal, like check_valid in solver.py
+    """
+    configs, rows, columns = shape_of(configs, columns)
+    return valid_configs(configs) & (parities(configs, columns) == parity(goal, columns))
+
+
+def manhattan(configs, goal, columns=None):
+    """
+    find the manhattan distance of each configuration from the goal, not counting the blank tile, the
+    same as the "manhattan" heuristic. the configurations must be valid
+    """
+    configs, rows, columns = shape_of(configs, columns)
+    goal_row, goal_column = goal_positions(goal, columns)
+    cells = np.arange(configs.shape[1])
+    distances = np.abs(goal_row[configs] - cells // columns) + np.abs(goal_column[configs] - cells % columns)
+    return np.where(configs != 0, distances, 0).sum(axis=1)
+
+
+def line_conflicts(keys, in_line):
+    """
+    find the extra moves for the conflicts in one row or column of every configuration: two for each tile
+    that is not in the longest run of tiles in their goal order, like LinearConflict.row_value
+
+    parameters:
+    - keys: an (N, length) array of where each tile in the line belongs along it
+    - in_line: an (N, length) array flagging the tiles that belong in the line
+    """
+    # longest[:, i] is the longest increasing run of tiles that belong in the line, ending with tile i
+    longest = np.zeros(keys.shape, dtype=np.int64)
+    for i in range(keys.shape[1]):
+        best = np.zeros(len(keys), dtype=np.int64)
+        for j in range(i):
+            before = in_line[:, j] & (keys[:, j] < keys[:, i])
+            best = np.maximum(best, np.where(before, longest[:, j], 0))
+        longest[:, i] = np.where(in_line[:, i], best+1, 0)
+    return 2*(in_line.sum(axis=1) - longest.max(axis=1, initial=0))
+
+
+def linear_conflict(configs, goal, columns=None):
+    """
+    find the linear conflict heuristic of each configuration, the same as the "linear_conflict" heuristic.
+    the configurations must be valid
+    """
+    configs, rows, columns = shape_of(configs, columns)
+    goal_row, goal_column = goal_positions(goal, columns)
+    total = manhattan(configs, goal, columns)
+
+    tile_row = goal_row[configs]
+    tile_column = goal_column[configs]
+    not_blank = configs != 0
+    for row in range(rows):
+        line = slice(row*columns, (row+1)*columns)
+        total += line_conflicts(tile_column[:, line], not_blank[:, line] & (tile_row[:, line] == row))
+    for column in range(columns):
+        line = slice(column, None, columns)
+        total += line_conflicts(tile_row[:, line], not_blank[:, line] & (tile_column[:, line] == column))
+    return total
+
+
+def score(configs, goal, columns=None):
+    """
+    check and score many configurations in one call, returning a dictionary of arrays with an entry for each:
+    "valid", "solvable", "parity", and the "manhattan" and "linear_conflict" heuristics, which are -1 for
+    invalid configurations
+
+    parameters:
+    - configs: an (N, cells) array of configurations, one per row, read row by row with 0 as the blank tile
+    - goal: the goal configuration
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+    configs, rows, columns = shape_of(configs, columns)
+    valid = valid_configs(configs)
+
+    # invalid configurations are scored as the goal, so their tiles can be looked up, then marked with -1
+    safe = np.where(valid[:, None], configs, np.asarray(goal, dtype=np.int64))
+    config_parity = parities(configs, columns)
+    return {
+        "valid": valid,
+        "solvable": valid & (config_parity == parity(goal, columns)),
+        "parity": config_parity,
+        "manhattan": np.where(valid, manhattan(safe, goal, columns), -1),
+        "linear_conflict": np.where(valid, linear_conflict(safe, goal, columns), -1)
+    }
+
+
+def read_chunks(file, size=CHUNK_SIZE):
+    """
+    read configurations from a file, one per line as for batch.py, and yield them as arrays of up to 'size'
+    rows, with the text of each line. blank lines and lines starting with '#' are skipped
+    """
+    lines = []
+    for line in file:
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+        lines.append(line)
+        if len(lines) == size:
+            yield lines, np.array([parse_config(line) for line in lines])
+            lines = []
+    if len(lines) > 0:
+        yield lines, np.array([parse_config(line) for line in lines])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the configurations that can reach a goal, written as instances for batch.py.")
+    parser.add_argument("input", help="file of configurations, one per line, or - for standard input")
+    parser.add_argument("goal", help="the goal, as a string of digits or comma separated tiles")
+    parser.add_argument("-o", "--output", help="file to write the instances to, instead of standard output")
+    parser.add_argument("--columns", type=int, default=None, help="the width of the boards, if they are not square")
+    parser.add_argument("--max-heuristic", type=int, default=None, help="only keep configurations with at most this linear conflict heuristic")
+    args = parser.parse_args()
+
+    goal = parse_config(args.goal)
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    output_file = sys.stdout if args.output is None else open(args.output, "w")
+
+    with input_file, output_file:
+        for lines, configs in read_chunks(input_file):
+            scores = score(configs, goal, args.columns)
+            keep = scores["solvable"]
+            if args.max_heuristic is not None:
+                keep &= scores["linear_conflict"] <= args.max_heuristic
+            for i in np.flatnonzero(keep):
+                output_file.write(lines[i] + " " + args.goal + "\n")
@@ -0,0 +1,161 @@
+import dbm
+from collections import OrderedDict
+
+from puzzle_board import board_shape, directions
+
+# the number of solutions kept in memory by default
+CACHE_SIZE = 10000
+
+# the symmetries of each board shape, by (rows, columns)
+SYMMETRIES = {}
+
+
+def symmetries(rows, columns):
+    """
+    find the symmetries of a board as permutations of its cells, so that a configuration 'config' is mapped
+    to [config[cell] for cell in symmetry]. cells next to each other stay next to each other, so a solution
+    of one configuration maps to a solution of the other. a rectangular board has 4 (the identity, the two
+    reflections and the half turn) and a square board has 8, as it can also be turned a quarter or transposed
+    """
+
+    if (rows, columns) not in SYMMETRIES:
+        maps = [
+            lambda row, column: (row, column),
+            lambda row, column: (row, columns-1-column),
+            lambda row, column: (rows-1-row, column),
+            lambda row, column: (rows-1-row, columns-1-column)
+        ]
+        if rows == columns:
+            maps += [
+                lambda row, column: (column, row),
+                lambda row, column: (column, rows-1-row),
+                lambda row, column: (columns-1-column, row),
+                lambda row, column: (columns-1-column, rows-1-row)
+            ]
+
+        SYMMETRIES[(rows, columns)] = []
+        for cell_map in maps:
+            cells = [cell_map(row, column) for row in range(rows) for column in range(columns)]
+            SYMMETRIES[(rows, columns)].append(tuple(row*columns + column for row, column in cells))
+    return SYMMETRIES[(rows, columns)]
+
+
+def canonical(start, goal, columns=None):
+    """
+    find the canonical form of an instance, which is the same for every instance that is a symmetry or a
+    relabelling of it. under each symmetry the tiles are renamed so the goal reads 1, 2, 3, ... around the
+    blank, which turns the instance into one of solving to a standard goal, and the smallest of the results
+    is kept. returns the key of the canonical form and the symmetry that gave it
+
+    parameters:
+    - start, goal: the configurations, read row by row with 0 as the blank tile
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+
+    rows, columns = board_shape(len(goal), columns)
+    best = None
+    for symmetry in symmetries(rows, columns):
+        new_start = [start[cell] for cell in symmetry]
+        new_goal = [goal[cell] for cell in symmetry]
+
+        # the new name of each tile is its place in the goal, not counting the blank
+        names = {0: 0}
+        for tile in new_goal:
+            if tile != 0:
+                names[tile] = len(names)
+
+        # the relabelled goal only depends on where its blank is, so that is all that is kept of it
+        key = bytes([columns, new_goal.index(0)] + [names[tile] for tile in new_start])
+        if best is None or key < best[0]:
+            best = (key, symmetry)
+    return best
+
+
+def blank_positions(blank_index, moves, columns):
+    """
+    find the positions of the blank as a list of moves is made, starting from blank_index
+    """
+    changes = directions(columns)
+    positions = [blank_index]
+    for move in moves:
+        positions.append(positions[-1] + changes[move])
+    return positions
+
+
+def position_moves(positions, columns):
+    """
+    find the codes of the moves that take the blank through a list of positions
+    """
+    changes = directions(columns)
+    return bytearray(changes.index(positions[i]-positions[i-1]) for i in range(1, len(positions)))
+
+
+class SolveCache:
+    """
+    solutions of instances that have already been solved, kept by the canonical form of the instance, so an
+    instance that is a symmetry or relabelling of one that has been solved is found too. the most recently
+    used solutions are kept in memory, and if a path is given, every solution is also kept in a file, so they
+    are remembered between runs. 'hits' and 'misses' count the solutions found and not found
+
+    parameters:
+    - size: the most solutions to keep in memory, after which the least recently used are forgotten
+    - path: the file to keep solutions in, or None to only keep them in memory
+    """
+
+    def __init__(self, size=CACHE_SIZE, path=None):
+        self.size = size
+        self.entries = OrderedDict()
+        self.store = dbm.open(path, "c") if path is not None else None
+        self.hits = 0
+        self.misses = 0
+
+    def remember(self, key, moves):
+        self.entries[key] = moves
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def get(self, start, goal, columns=None):
+        """
+        return the codes of the moves of a solution of an instance (see puzzle_board.directions), or None if
+        it has not been solved before
+        """
+        key, symmetry = canonical(start, goal, columns)
+
+        moves = self.entries.get(key)
+        if moves is not None:
+            self.entries.move_to_end(key)
+        elif self.store is not None and key in self.store:
+            moves = self.store[key]
+            self.remember(key, moves)
+
+        if moves is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        # the moves are stored for the canonical form, so map the blank's path back through the symmetry
+        columns = board_shape(len(goal), columns)[1]
+        positions = blank_positions(symmetry.index(start.index(0)), moves, columns)
+        return position_moves([symmetry[position] for position in positions], columns)
+
+    def put(self, start, goal, moves, columns=None):
+        """
+        keep the solution of an instance, given as the codes of its moves
+        """
+        key, symmetry = canonical(start, goal, columns)
+        columns = board_shape(len(goal), columns)[1]
+        positions = blank_positions(start.index(0), moves, columns)
+        moves = bytes(position_moves([symmetry.index(position) for position in positions], columns))
+
+        self.remember(key, moves)
+        if self.store is not None:
+            self.store[key] = moves
+
+    def close(self):
+        """
+        close the file of solutions, if there is one
+        """
+        if self.store is not None:
+            self.store.close()
+            self.store = None
@@ -0,0 +1,848 @@
+from heapq import heappush, heappop
+from math import inf
+from sys import getsizeof
+from time import perf_counter
+
+from distance_oracle import get_oracle
+from heuristics import make_heuristic
+from puzzle_board import BOARDS, board_shape, parity
+
+# the weight an anytime search starts with, and how much it is lowered by after each solution
+ANYTIME_WEIGHT = 3
+ANYTIME_STEP = 0.5
+
+
+class ListFrontier:
+    """
+    the original open and closed lists, where finding the minimum and checking
+    membership both scan the whole list. kept so the heap frontier can be benchmarked against it
+    
+    parameters:
+    - configurations: the configurations dictionary of the search, used to look up f values
+    """
+    
+    def __init__(self, configurations):
+        self.configurations = configurations
+        self.open_list = []
+        self.closed = []
+        
+    def __len__(self):
+        return len(self.open_list)
+    
+    def __contains__(self, node):
+        return node in self.open_list
+    
+    def __iter__(self):
+        return iter(self.open_list)
+    
+    def find_min(self):
+        """
+        find the node with the minimum f value in the open list
+        """
+        minimum = inf
+        min_node = None
+        for node in self.open_list:
+            if self.configurations[node][0] < minimum:
+                minimum = self.configurations[node][0]
+                min_node = node
+        return min_node
+    
+    def push(self, node):
+        self.open_list.append(node)
+        
+    def pop(self):
+        """
+        remove and return the node with the minimum f value in the open list
+        """
+        node = self.find_min()
+        self.open_list.remove(node)
+        return node
+    
+    def remove(self, node):
+        self.open_list.remove(node)
+        
+    def close(self, node):
+        self.closed.append(node)
+        
+    def reopen(self, node):
+        self.closed.remove(node)
+        
+    def is_closed(self, node):
+        return node in self.closed
+
+
+class HeapFrontier:
+    """
+    open and closed lists backed by a binary heap and hash sets. removing a node from the
+    open list only forgets it, and its heap entry is skipped when it reaches the top (lazy deletion).
+    nodes are popped in the same order as the list frontier: lowest f first, then the earliest pushed
+    
+    parameters:
+    - configurations: the configurations dictionary of the search, used to look up f values
+    """
+    
+    def __init__(self, configurations):
+        self.configurations = configurations
+        self.heap = []
+        # the push number of each node currently in the open list
+        self.open_order = {}
+        self.closed = set()
+        self.counter = 0
+        
+    def __len__(self):
+        return len(self.open_order)
+    
+    def __contains__(self, node):
+        return node in self.open_order
+    
+    def __iter__(self):
+        return iter(self.open_order)
+    
+    def push(self, node):
+        self.counter += 1
+        self.open_order[node] = self.counter
+        heappush(self.heap, (self.configurations[node][0], self.counter, node))
+        
+    def pop(self):
+        """
+        remove and return the node with the minimum f value in the open list
+        """
+        while self.heap:
+            f, order, node = heappop(self.heap)
+            
+            # skip entries for nodes that have since been removed or pushed again
+            if self.open_order.get(node) != order:
+                continue
+            
+            # if the f value changed while the node was waiting, put it back at its new value
+            if f != self.configurations[node][0]:
+                heappush(self.heap, (self.configurations[node][0], order, node))
+                continue
+            
+            del self.open_order[node]
+            return node
+        return None
+    
+    def remove(self, node):
+        del self.open_order[node]
+        
+    def close(self, node):
+        self.closed.add(node)
+        
+    def reopen(self, node):
+        self.closed.remove(node)
+        
+    def is_closed(self, node):
+        return node in self.closed
+
+
+FRONTIERS = {
+    "heap": HeapFrontier,
+    "list": ListFrontier
+}
+
+
+class SearchDirection:
+    """
+    one side of a bidirectional search: the costs of the configurations reached from one end and the
+    moves that reached them, and the open nodes in three heaps, ordered by priority (the larger of f and 2g), by f
+    and by g. like HeapFrontier, nodes pushed again leave their old entries behind to be skipped
+    
+    parameters:
+    - board: the board to search on, with its heuristic towards the other end
+    - state: the configuration this side starts from, in the board's representation
+    """
+    
+    def __init__(self, board, state):
+        self.board = board
+        self.g = {state: 0}
+        self.h = {state: board.evaluate(state)}
+        self.move = {state: None}
+        self.heaps = ([], [], [])
+        # the push number of each node currently open
+        self.open_order = {}
+        self.counter = 0
+        self.push(state)
+        
+    def push(self, node):
+        g = self.g[node]
+        f = g + self.h[node]
+        self.counter += 1
+        self.open_order[node] = self.counter
+        heappush(self.heaps[0], (max(f, 2*g), self.counter, node))
+        heappush(self.heaps[1], (f, self.counter, node))
+        heappush(self.heaps[2], (g, self.counter, node))
+        
+    def minimum(self, i):
+        """
+        the smallest priority (i = 0), f (i = 1) or g (i = 2) of the open nodes, or inf if there are none
+        """
+        heap = self.heaps[i]
+        while heap and self.open_order.get(heap[0][2]) != heap[0][1]:
+            heappop(heap)
+        return heap[0][0] if heap else inf
+    
+    def pop(self):
+        """
+        remove and return the open node with the smallest priority
+        """
+        self.minimum(0)
+        node = heappop(self.heaps[0])[2]
+        del self.open_order[node]
+        return node
+
+
+class SearchStats:
+    """
+    what a search did: the nodes generated (every move made), expanded, and generated again after they had
+    already been seen (duplicates), the closed nodes opened again after a cheaper path to them was found,
+    the most open and closed nodes at once, the heuristic evaluations, and the bytes used by the stored
+    configurations. the times are in seconds: the whole search, and if the search was asked to time them,
+    the time spent finding the node with the minimum f value, expanding nodes, and working out heuristics
+    (which is part of the time spent expanding)
+    
+    every search fills the same fields, except for what it does not do. IDA* keeps no open or closed lists
+    or stored configurations, so it finds no duplicates, its peak open size is the deepest path it searched,
+    and its closed size and bytes are 0, and it only times heuristics. the bidirectional search works out
+    each child's heuristic as it makes the move, so it times that as part of expanding and leaves the
+    heuristic time at 0. the oracle does no search, so only its total time is filled
+    
+    the bytes take a pass over every stored configuration, so they are only worked out when they are read,
+    and never count towards the times
+    """
+    
+    FIELDS = ["generated", "expanded", "duplicates", "reopened", "peak_open", "peak_closed", "heuristic_evaluations",
+              "configuration_bytes", "time_total", "time_find_min", "time_expand", "time_heuristic"]
+    
+    def __init__(self):
+        self.generated = 0
+        self.expanded = 0
+        self.duplicates = 0
+        self.reopened = 0
+        self.peak_open = 0
+        self.peak_closed = 0
+        self.heuristic_evaluations = 0
+        self.time_total = 0
+        self.time_find_min = 0
+        self.time_expand = 0
+        self.time_heuristic = 0
+        
+        # the dictionaries of configurations the search keeps, which configuration_bytes measures
+        self.stores = []
+        
+    @property
+    def configuration_bytes(self):
+        return store_bytes(*self.stores)
+        
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+def store_bytes(*dictionaries):
+    """
+    the bytes used by dictionaries of configurations, counting the dictionaries, their keys and their values
+    """
+    total = 0
+    for dictionary in dictionaries:
+        total += getsizeof(dictionary)
+        for key, value in dictionary.items():
+            total += getsizeof(key) + getsizeof(value)
+    return total
+
+
+class Astar:
+    
+    def __init__(self, heuristic_type, start, goal, frontier="heap", board="tuple", columns=None, search="astar", cache=None,
+                 timers=False, sample=None, sample_interval=1000, weight=None, time_limit=None):
+        self.heuristic_type = heuristic_type
+        self.start = start
+        self.goal = goal
+        self.search = search
+        
+        # A* and IDA* order nodes by f = g + weight*h, which finds a solution at most 'weight' times the length
+        # of the shortest, usually after expanding far fewer nodes. an anytime search starts at this weight
+        # (ANYTIME_WEIGHT if it is None) and lowers it, and stops improving its solution after 'time_limit'
+        # seconds. bidirectional and oracle searches always find a shortest solution
+        if weight is None:
+            weight = ANYTIME_WEIGHT if search == "anytime" else 1
+        self.weight = weight
+        self.time_limit = time_limit
+        
+        # the backward side of a bidirectional search aims its heuristic at the start, and a pattern database
+        # for every start would take a breadth first search of the whole 8-puzzle and a file of its own
+        if search == "bidirectional" and heuristic_type == "pdb":
+            raise ValueError("the bidirectional search can not use the pdb heuristic")
+        
+        # a SolveCache to look the solution up in before searching, and to keep it in afterwards
+        self.cache = cache
+        
+        # the codes of the moves of the solution (see puzzle_board.directions), or None if there is none,
+        # and the most its length can be over the shortest, as a multiple of it
+        self.moves = None
+        self.solution_list = None
+        self.suboptimality = None
+        
+        # what the search did, see SearchStats. timing each phase of A* slows it down, so it is only done if
+        # 'timers' is set. if 'sample' is given, it is called with the search every 'sample_interval' expansions
+        self.stats = SearchStats()
+        self.timers = timers
+        self.sample = sample
+        self.sample_interval = sample_interval
+        
+        # the progress of the search, which can be read from another thread while it runs: the f value being
+        # searched (the bound of IDA*, or the lower bound of a bidirectional search), and the number of open
+        # nodes (the length of the current path for IDA*). the nodes expanded are in 'expanded'
+        self.bound = 0
+        self.frontier_size = 0
+        
+        # set by cancel to stop the search early, leaving no solution
+        self.cancelled = False
+        
+        # the configurations are stored in the board's own representation, see puzzle_board.py.
+        # the heuristic can be given by name, or as a Heuristic object, see heuristics.py
+        self.board = BOARDS[board](make_heuristic(heuristic_type, goal, columns), goal, columns)
+        self.start_state = self.board.encode(start)
+        self.goal_state = self.board.encode(goal)
+        
+        # each configuration seen maps to [f, g, h, move], where move is the code of the move that
+        # reached it from its parent (see puzzle_board.directions), or None for the start
+        h = self.distance_heuristic(self.start_state)
+        self.stats.heuristic_evaluations += 1
+        self.configurations = {
+            self.start_state: [self.weight*h, 0, h, None]
+        }
+        self.frontier = FRONTIERS[frontier](self.configurations)
+            
+
+    def distance_heuristic(self, node):
+        """ 
+        calculates the distance heuristic (h-value) for a given node
+        
+        parameters:
+        - node: a configuration, in the board's representation
+        """
+        
+        return self.board.evaluate(node)
+
+
+    def child(self, swap, node, blank_index):
+        
+        """
+        swap two positions in a configuration, and add the new configuration to the configurations
+        dictionary if it has not been seen before
+        
+        parameters:
+        - swap: the new position for the blank tile
+        - node: the configuration to work on
+        - blank_index: the position of the blank tile
+        """
+        
+        # swap the two positions
+        new_config = self.board.move(node, blank_index, swap)
+        self.stats.generated += 1
+        
+        # a configuration that has been seen before keeps its cost, heuristic and move. a new one
+        # gets its distance heuristic from the parent's, as only the moved tile and the blank tile
+        # change their distance, and has no cost until the search finds a path to it
+        if new_config not in self.configurations:
+            if self.timers:
+                start_time = perf_counter()
+            h = self.board.child_heuristic(node, blank_index, swap, self.configurations[node][2])
+            if self.timers:
+                self.stats.time_heuristic += perf_counter() - start_time
+            self.stats.heuristic_evaluations += 1
+            self.configurations[new_config] = [inf, inf, h, None]
+        else:
+            self.stats.duplicates += 1
+
+        return new_config
+
+    def expand(self, node):
+        """
+        expand a node, and return its children
+        
+        parameters:
+        - node: the configuration to expand
+        """
+        
+        # for each possible move, make the move and add the result to the list
+        children = []
+
+        blank_index = self.board.blank(node)
+        for swap in self.board.swaps[blank_index]:
+            new_child = self.child(swap, node, blank_index)
+            if new_child in self.configurations.keys():
+                children.append(new_child)
+
+        return children
+
+
+    def backtrack(self, current):
+        """ 
+        find the moves of the solution path by undoing the move that reached each node, back to the start
+        """
+        moves = bytearray()
+        while self.configurations[current][3] is not None:
+            move = self.configurations[current][3]
+            moves.append(move)
+            current = self.board.undo(current, move)
+        moves.reverse()
+        return moves
+    
+    def path(self):
+        """
+        generate the configurations of the solution path from the start to the goal, made from the moves as they are asked for
+        """
+        if self.moves is not None:
+            yield from self.board.replay(self.start, self.moves)
+    
+    def save_solution(self, filename):
+        """
+        write the solution path to a file, one configuration per line as comma separated tiles, which is how
+        batch.py reads configurations. the configurations are written as they are made, without building a list
+        """
+        with open(filename, "w") as file:
+            for config in self.path():
+                file.write(",".join(str(tile) for tile in config) + "\n")
+    
+    @property
+    def expanded(self):
+        """
+        the number of nodes expanded so far
+        """
+        return self.stats.expanded
+    
+    @property
+    def solution(self):
+        """
+        the solution path as a list of configurations, or an empty list if there is none. it is only built
+        the first time it is asked for, so searches whose paths are not needed never build it
+        """
+        if self.solution_list is None:
+            self.solution_list = list(self.path())
+        return self.solution_list
+        
+        
+    def cancel(self):
+        """
+        stop the search as soon as it next expands a node. this can be called from another thread
+        """
+        self.cancelled = True
+        
+    def algorithm(self):
+        """
+        find the solution with the search that was chosen: A*, or IDA*, bidirectional or anytime search if the
+        search was set to "ida", "bidirectional" or "anytime". if it was set to "oracle", the solution is read
+        from the distance oracle of the goal instead. if there is a cache, the solution is looked up in it first
+        """
+        
+        start_time = perf_counter()
+        
+        if self.cache is not None:
+            self.moves = self.cache.get(self.start, self.goal, self.board.columns)
+            if self.moves is not None:
+                self.suboptimality = 1
+                self.stats.time_total = perf_counter() - start_time
+                return
+        
+        if self.search == "ida":
+            self.ida_algorithm()
+        elif self.search == "bidirectional":
+            self.bidirectional_algorithm()
+        elif self.search == "oracle":
+            self.moves = get_oracle(self.goal, self.board.columns).solve_moves(self.start)
+        elif self.search == "anytime":
+            self.stats.stores = [self.configurations]
+            for moves, bound in self.anytime_algorithm(self.weight, ANYTIME_STEP, self.time_limit):
+                pass
+        else:
+            self.stats.stores = [self.configurations]
+            self.astar_algorithm()
+        self.stats.time_total = perf_counter() - start_time
+        
+        if self.moves is not None and self.suboptimality is None:
+            self.suboptimality = self.weight if self.search in ("astar", "ida") else 1
+        
+        # only shortest solutions are kept, so a weighted search never gives a later search a longer solution
+        if self.cache is not None and self.moves is not None and self.suboptimality == 1:
+            self.cache.put(self.start, self.goal, self.moves, self.board.columns)
+            
+    def astar_algorithm(self):
+        """
+        A* Algorithm
+        """
+        
+        stats = self.stats
+        self.frontier.push(self.start_state)
+
+
+        # A* Algorithm
+        while len(self.frontier) > 0:
+            if self.cancelled:
+                return
+            stats.peak_open = max(stats.peak_open, len(self.frontier))
+            
+            # take the node with the minimum f value off the open list, and add it to the closed list
+            if self.timers:
+                start_time = perf_counter()
+            current = self.frontier.pop()
+            if self.timers:
+                stats.time_find_min += perf_counter() - start_time
+            self.frontier.close(current)
+            stats.peak_closed = max(stats.peak_closed, len(self.frontier.closed))
+            stats.expanded += 1
+            self.bound = self.configurations[current][0]
+            self.frontier_size = len(self.frontier)
+            if self.sample is not None and stats.expanded % self.sample_interval == 0:
+                self.sample(self)
+
+            # if we are done, the finish
+            if current == self.goal_state:
+                break
+
+            if self.timers:
+                start_time = perf_counter()
+            children = self.expand(current)
+            if self.timers:
+                stats.time_expand += perf_counter() - start_time
+
+            # for each child node
+            for config in children:
+                
+                # update the distance from the start node
+                cost = self.configurations[current][1] + 1
+                
+                # if the new cost is better than the old cost, prepare it to be updated
+                if config in self.frontier and cost < self.configurations[config][1]:
+                    self.frontier.remove(config)
+                elif self.frontier.is_closed(config) and cost < self.configurations[config][1]:
+                    self.frontier.reopen(config)
+                    stats.reopened += 1
+                
+                # if it is in neither the open or closed list, update the cost of
+                # getting to the node, and add it to the open list
+                if config not in self.frontier and not self.frontier.is_closed(config):
+                    self.configurations[config][1] = cost
+                    self.configurations[config][0] = self.configurations[config][1]+self.weight*self.configurations[config][2]
+                    self.configurations[config][3] = self.board.move_codes[self.board.blank(current)][self.board.blank(config)]
+                    self.frontier.push(config)
+
+
+        # find the solution path, if the goal was reached
+        if self.goal_state in self.configurations and self.configurations[self.goal_state][1] < inf:
+            self.moves = self.backtrack(self.goal_state)
+
+
+    def anytime_algorithm(self, weight=ANYTIME_WEIGHT, step=ANYTIME_STEP, time_limit=None):
+        """
+        anytime repairing A* (ARA*). a weighted A* search finds a first solution quickly, then the weight is
+        lowered by 'step' and the search carries on from where it stopped rather than starting again: a node
+        whose cost falls after it was expanded is put aside, and only opened again for the next weight, so
+        each node is expanded at most once per weight. this repeats until the weight reaches 1, or nothing
+        open could give a shorter solution, when the solution is the shortest. each shorter solution is set
+        as 'moves' and yielded as its moves and the most its length can be over the shortest, as a multiple
+        of it, which is also kept in 'suboptimality'
+        
+        parameters:
+        - weight: the weight of the first search, see Astar
+        - step: how much the weight is lowered by after each search
+        - time_limit: the seconds to keep improving the solution for once the first one is found, or None
+          to carry on until it is the shortest
+        """
+        
+        stats = self.stats
+        configurations = self.configurations
+        goal = self.goal_state
+        deadline = None
+        inconsistent = set()
+        
+        start = configurations[self.start_state]
+        start[0] = start[1] + weight*start[2]
+        self.frontier.push(self.start_state)
+        
+        while True:
+            # search until no open node has a smaller f value than the cost of the best solution
+            while len(self.frontier) > 0:
+                if self.cancelled or (deadline is not None and perf_counter() > deadline):
+                    return
+                stats.peak_open = max(stats.peak_open, len(self.frontier))
+                
+                if self.timers:
+                    start_time = perf_counter()
+                current = self.frontier.pop()
+                if self.timers:
+                    stats.time_find_min += perf_counter() - start_time
+                if goal in configurations and configurations[current][0] >= configurations[goal][1]:
+                    self.frontier.push(current)
+                    break
+                self.frontier.close(current)
+                stats.peak_closed = max(stats.peak_closed, len(self.frontier.closed))
+                stats.expanded += 1
+                self.bound = configurations[current][0]
+                self.frontier_size = len(self.frontier)
+                if self.sample is not None and stats.expanded % self.sample_interval == 0:
+                    self.sample(self)
+                
+                if self.timers:
+                    start_time = perf_counter()
+                children = self.expand(current)
+                if self.timers:
+                    stats.time_expand += perf_counter() - start_time
+                
+                for config in children:
+                    cost = configurations[current][1] + 1
+                    if cost >= configurations[config][1]:
+                        continue
+                    configurations[config][1] = cost
+                    configurations[config][0] = cost + weight*configurations[config][2]
+                    configurations[config][3] = self.board.move_codes[self.board.blank(current)][self.board.blank(config)]
+                    
+                    # a node already expanded at this weight waits for the next one
+                    if self.frontier.is_closed(config):
+                        inconsistent.add(config)
+                        stats.reopened += 1
+                    else:
+                        if config in self.frontier:
+                            self.frontier.remove(config)
+                        self.frontier.push(config)
+            
+            if goal not in configurations or configurations[goal][1] == inf:
+                return
+            
+            # every solution is at least as long as the smallest g+h of the nodes still open or put aside
+            cost = configurations[goal][1]
+            lower = min((configurations[node][1] + configurations[node][2] for node in list(self.frontier) + list(inconsistent)), default=inf)
+            bound = 1 if lower >= cost else min(weight, cost/lower)
+            
+            if self.moves is None or cost < len(self.moves):
+                self.moves = self.backtrack(goal)
+                self.suboptimality = bound
+                yield self.moves, bound
+            self.suboptimality = bound
+            
+            if bound <= 1:
+                return
+            if time_limit is not None and deadline is None:
+                deadline = perf_counter() + time_limit
+            
+            # lower the weight, and open the put aside nodes again, with every open node at its new f value
+            weight = max(1, weight - step)
+            nodes = list(self.frontier) + list(inconsistent)
+            inconsistent = set()
+            self.frontier = type(self.frontier)(configurations)
+            for node in nodes:
+                configurations[node][0] = configurations[node][1] + weight*configurations[node][2]
+                self.frontier.push(node)
+
+
+    def ida_algorithm(self):
+        """
+        IDA* Algorithm. repeated depth first searches from the start, each cutting off any node
+        with an f value over a bound, which is raised to the smallest f value that was cut off.
+        only the current path is kept, and every move is made and undone on a single board,
+        so the memory used grows with the length of the solution rather than the nodes searched
+        """
+        
+        board = list(self.start)
+        goal = list(self.goal)
+        swaps = self.board.swaps
+        heuristic = self.board.heuristic
+        weight = self.weight
+        stats = self.stats
+        
+        # the position of the blank tile after each move on the current path
+        path = [board.index(0)]
+        
+        def search(g, h, bound, previous):
+            """
+            search below the last configuration on the path, and return True if the goal was found,
+            otherwise the smallest f value over the bound
+            
+            parameters:
+            - g, h: the cost and heuristic of the configuration
+            - bound: the largest f value to search
+            - previous: where the blank tile was before the last move, which is never moved back
+            """
+            
+            f = g + weight*h
+            if f > bound:
+                return f
+            if board == goal:
+                return True
+            
+            stats.expanded += 1
+            stats.peak_open = max(stats.peak_open, len(path))
+            self.frontier_size = len(path)
+            if self.sample is not None and stats.expanded % self.sample_interval == 0:
+                self.sample(self)
+            if self.cancelled:
+                return inf
+            minimum = inf
+            blank_index = path[-1]
+            for swap in swaps[blank_index]:
+                if swap == previous:
+                    continue
+                
+                # make the move
+                tile = board[swap]
+                if self.timers:
+                    start_time = perf_counter()
+                child_h = heuristic.update(h, board, blank_index, swap, tile)
+                if self.timers:
+                    stats.time_heuristic += perf_counter() - start_time
+                stats.generated += 1
+                stats.heuristic_evaluations += 1
+                board[blank_index] = tile
+                board[swap] = 0
+                path.append(swap)
+                
+                result = search(g+1, child_h, bound, blank_index)
+                if result is True:
+                    return True
+                minimum = min(minimum, result)
+                
+                # undo the move
+                path.pop()
+                board[swap] = tile
+                board[blank_index] = 0
+                
+            return minimum
+        
+        h = heuristic.evaluate(self.start)
+        stats.heuristic_evaluations += 1
+        bound = weight*h
+        while True:
+            self.bound = bound
+            result = search(0, h, bound, None)
+            if result is True:
+                break
+            # stop if no configuration was cut off, as the whole space has been searched
+            if result == inf or self.cancelled:
+                return
+            bound = result
+        
+        # find the moves from the positions of the blank
+        move_codes = self.board.move_codes
+        self.moves = bytearray(move_codes[path[i-1]][path[i]] for i in range(1, len(path)))
+        
+    def bidirectional_algorithm(self):
+        """
+        bidirectional A* with the MM meet in the middle rule. the search runs forwards from the start and
+        backwards from the goal, with the same heuristic aimed at the start for the backward side, and
+        always expands the side with the smallest priority max(f, 2g), so neither side searches past the
+        midpoint of the solution. U is the shortest path found through a node both sides have reached,
+        and the search stops once nothing left open could give a shorter one. with an admissible heuristic
+        the solution is optimal
+        """
+        
+        # a heuristic given as an object only knows its own goal, so the backward side searches without one
+        backward_type = self.heuristic_type if isinstance(self.heuristic_type, str) else None
+        backward_board = type(self.board)(make_heuristic(backward_type, self.start, self.board.columns, cache=False), self.start, self.board.columns)
+        
+        forward = SearchDirection(self.board, self.start_state)
+        backward = SearchDirection(backward_board, self.goal_state)
+        stats = self.stats
+        stats.heuristic_evaluations += 2
+        stats.stores = [forward.g, forward.h, forward.move, backward.g, backward.h, backward.move]
+        
+        best = 0 if self.start_state == self.goal_state else inf
+        meeting = self.start_state
+        
+        while forward.open_order and backward.open_order:
+            if self.cancelled:
+                break
+            
+            # stop when no open node can be on a shorter path: every such path has cost at least the smallest
+            # priority, the smallest f on either side, and the smallest g on both sides plus the move between them
+            forward_priority = forward.minimum(0)
+            backward_priority = backward.minimum(0)
+            bound = max(min(forward_priority, backward_priority), forward.minimum(1), backward.minimum(1),
+                        forward.minimum(2) + backward.minimum(2) + 1)
+            if best <= bound:
+                break
+            self.bound = bound
+            self.frontier_size = len(forward.open_order) + len(backward.open_order)
+            stats.peak_open = max(stats.peak_open, self.frontier_size)
+            stats.peak_closed = max(stats.peak_closed, len(forward.g) + len(backward.g) - self.frontier_size)
+            
+            # expand the side with the smallest priority
+            if forward_priority <= backward_priority:
+                side, other = forward, backward
+            else:
+                side, other = backward, forward
+            if self.timers:
+                start_time = perf_counter()
+            current = side.pop()
+            if self.timers:
+                stats.time_find_min += perf_counter() - start_time
+            stats.expanded += 1
+            if self.sample is not None and stats.expanded % self.sample_interval == 0:
+                self.sample(self)
+            
+            if self.timers:
+                start_time = perf_counter()
+            blank_index = side.board.blank(current)
+            for swap in side.board.swaps[blank_index]:
+                config, h = side.board.step(current, blank_index, swap, side.h[current])
+                cost = side.g[current] + 1
+                stats.generated += 1
+                stats.heuristic_evaluations += 1
+                
+                # skip nodes already reached at least as cheaply, otherwise (re)open them
+                if config in side.g:
+                    if side.g[config] <= cost:
+                        stats.duplicates += 1
+                        continue
+                    if config not in side.open_order:
+                        stats.reopened += 1
+                side.g[config] = cost
+                side.h[config] = h
+                side.move[config] = side.board.move_codes[blank_index][swap]
+                side.push(config)
+                
+                # a node reached from both ends gives a path between them
+                if config in other.g and cost + other.g[config] < best:
+                    best = cost + other.g[config]
+                    meeting = config
+            if self.timers:
+                stats.time_expand += perf_counter() - start_time
+        
+        if best == inf or self.cancelled:
+            return
+        
+        # join the moves from the start to the meeting node with the moves on from there to the goal,
+        # which are the backward side's moves in reverse, each in the opposite direction
+        moves = bytearray()
+        node = meeting
+        while forward.move[node] is not None:
+            moves.append(forward.move[node])
+            node = self.board.undo(node, forward.move[node])
+        moves.reverse()
+        node = meeting
+        while backward.move[node] is not None:
+            moves.append(3 - backward.move[node])
+            node = self.board.undo(node, backward.move[node])
+        self.moves = moves
+        
+def check_valid(start_tuple, goal_tuple, columns=None):
+    """
+    Check whether a given state is valid, and solvable
+    
+    parameters:
+    - start_tuple, goal_tuple: the configurations, read row by row with 0 as the blank tile
+    - columns: the width of the board. if None, the board is taken to be square
+    """
+    
+    # if the tuple is not valid
+    if len(start_tuple) != len(goal_tuple) or board_shape(len(start_tuple), columns) is None:
+        return [False, "invalid"]
+    
+    elif set(start_tuple) != set(range(len(start_tuple))) or set(goal_tuple) != set(range(len(goal_tuple))):
+        return [False, "invalid"]    
+    
+    # check whether the parity of the start and goal are acceptable
+    columns = board_shape(len(start_tuple), columns)[1]
+    if parity(start_tuple, columns) != parity(goal_tuple, columns):
+        return [False, "parity"]
+    
+    return [True, None]